@@ -38,12 +38,12 @@ setup(
         "Development Status :: 5 - Production/Stable",
         "Programming Language :: Python",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.5",
         "Programming Language :: Python :: 3.6",
         "Intended Audience :: Developers",
         "License :: OSI Approved :: GNU General Public License (GPL)",
        ],
     keywords='reactive functional dataflow asyncio gevent',
+    python_requires='>=3.6',
 
     packages=['metapensiero.' + package
               for package in find_packages('src/metapensiero')],
@@ -62,5 +62,8 @@ from .tracker import Tracker
 from .value import Value
 from .flush import AsyncioFlushManager
 from .nlist import reactivenamedlist as namedlist
-from .computation import BaseComputation, Computation, computation
+from .computation import (BaseComputation, Computation, CoroutineComputation,
+                          IncrementalComputation, computation, PRIORITY)
 from .dict import ReactiveDict, ReactiveChainMap
+from .memo import Memo, computed
+from .executor import Offloaded
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+# :Project: metapensiero.reactive -- incremental aggregates of reactive dicts
+# :Created: ven 16 ott 2026 21:13:12 CEST
+# :Author:  agent <agent@local>
+# :License: GNU General Public License version 3 or later
+#
+
+import functools
+import heapq
+import itertools
+import logging
+import operator
+
+from .base import Tracked
+from .dependency import Dependency
+from .dict import missing
+from .views import SourceFollower, _Descending
+
+logger = logging.getLogger(__name__)
+
+
+class Aggregate(SourceFollower, Tracked):
+    """The base class of the values aggregated over the values of a
+    :class:`~.dict.ReactiveDict` or of a view derived from it.
+
+    An aggregate is maintained incrementally from the change events of the
+    dict, see :class:`~.views.DictView` for their limits, and it's read
+    using its ``value`` member or calling it. When it's read by a
+    computation, the computation is invalidated only when the aggregated
+    value changes according to the `equal` function.
+
+    The aggregate is kept alive by the dict, call :meth:`stop` when it's
+    not needed anymore.
+
+    :param source: the :class:`~.dict.ReactiveDict` instance
+    :param func: an optional function that is called with each value of
+      the dict and returns the value to aggregate in its place
+    :param equal: an optional equality comparison function to be used
+      instead of the default ``operator.eq``
+    :param label: an optional name, used by the diagnostic tools
+    """
+
+    def __init__(self, source, func=None, equal=None, *, tracker=None,
+                 label=None):
+        if tracker is None:
+            tracker = source._tracker
+        super().__init__(tracker=tracker)
+        self._func = func
+        self._equal = equal or operator.eq
+        self._values = {}
+        """The aggregated values, by key of the dict"""
+        self._dep = Dependency(self, tracker=tracker,
+                               label=label or type(self).__qualname__)
+        self._value = missing
+        self._follow_source(source)
+        self._value = self._result()
+
+    def __call__(self):
+        return self.value
+
+    def __repr__(self):
+        return '<{} {!r}>'.format(type(self).__name__, self._value)
+
+    def _add(self, key, value):
+        """Add the value of a key to the aggregate."""
+        raise NotImplementedError()
+
+    def _remove(self, key, value):
+        """Remove the value of a key from the aggregate."""
+        raise NotImplementedError()
+
+    def _result(self):
+        """Return the aggregated value."""
+        raise NotImplementedError()
+
+    def _source_del(self, key):
+        old = self._values.pop(key, missing)
+        if old is not missing:
+            self._remove(key, old)
+            self._update()
+
+    def _source_set(self, key, value):
+        if self._func is not None:
+            value = self._func(value)
+        old = self._values.get(key, missing)
+        if old is not missing:
+            self._remove(key, old)
+        self._values[key] = value
+        self._add(key, value)
+        self._update()
+
+    def _update(self):
+        old = self._value
+        if old is missing:
+            # still being populated
+            return
+        new = self._result()
+        if not self._equal(old, new):
+            self._value = new
+            self._dep.value_changed(old, new, self._equal)
+
+    @property
+    def value(self):
+        if self.tracker.active:
+            self._dep.depend()
+        return self._value
+
+
+def _counted(value):
+    return True
+
+
+def _satisfies(pred, value):
+    return bool(pred(value))
+
+
+class Count(Aggregate):
+    """The number of the values of the dict, or of those that satisfy a
+    predicate. It's updated in constant time.
+
+    :param pred: an optional predicate taking a value of the dict
+    """
+
+    def __init__(self, source, pred=None, *, tracker=None, label=None):
+        self._count = 0
+        if pred is None:
+            func = _counted
+        else:
+            func = functools.partial(_satisfies, pred)
+        super().__init__(source, func, tracker=tracker, label=label)
+
+    def _add(self, key, counted):
+        if counted:
+            self._count += 1
+
+    def _remove(self, key, counted):
+        if counted:
+            self._count -= 1
+
+    def _result(self):
+        return self._count
+
+
+class Sum(Aggregate):
+    """The sum of the values. It's updated in constant time."""
+
+    def __init__(self, source, func=None, equal=None, *, tracker=None,
+                 label=None):
+        self._sum = 0
+        super().__init__(source, func, equal, tracker=tracker, label=label)
+
+    def _add(self, key, value):
+        self._sum += value
+
+    def _remove(self, key, value):
+        self._sum -= value
+
+    def _result(self):
+        return self._sum
+
+
+class Mean(Sum):
+    """The arithmetic mean of the values, ``None`` if there is none. It's
+    updated in constant time."""
+
+    def _result(self):
+        count = len(self._values)
+        return self._sum / count if count else None
+
+
+class _HeapAggregate(Aggregate):
+    """Base class of the aggregates that keep the values in a heap. The
+    removed values are left in the heap and discarded when they reach its
+    top, the heap is compacted when they outnumber the live ones.
+
+    :param largest: if ``True`` the heap is ordered from the largest value
+    """
+
+    def __init__(self, source, func=None, equal=None, largest=False, *,
+                 tracker=None, label=None):
+        self._largest = largest
+        self._heap = []
+        self._entries = {}
+        """The live entry in the heap, by key"""
+        self._stale = 0
+        """The number of the removed entries still in the heap"""
+        self._seq = itertools.count()
+        super().__init__(source, func, equal, tracker=tracker, label=label)
+
+    def _add(self, key, value):
+        entry = [_Descending(value) if self._largest else value,
+                 next(self._seq), key]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+
+    def _remove(self, key, value):
+        del self._entries[key]
+        self._stale += 1
+        if self._stale > len(self._entries) + 32:
+            self._heap = list(self._entries.values())
+            heapq.heapify(self._heap)
+            self._stale = 0
+
+    def _valid(self, entry):
+        return self._entries.get(entry[2]) is entry
+
+    def _peek(self):
+        """Return the key at the top of the heap, or `missing` if empty."""
+        heap = self._heap
+        while heap and not self._valid(heap[0]):
+            heapq.heappop(heap)
+            self._stale -= 1
+        return heap[0][2] if heap else missing
+
+    def _top(self, n):
+        """Return the keys of the first `n` live entries of the heap."""
+        heap = self._heap
+        entries = []
+        while heap and len(entries) < n:
+            entry = heapq.heappop(heap)
+            if self._valid(entry):
+                entries.append(entry)
+            else:
+                self._stale -= 1
+        for entry in entries:
+            heapq.heappush(heap, entry)
+        return [entry[2] for entry in entries]
+
+
+class Min(_HeapAggregate):
+    """The smallest value, or `default` if there is none. It's updated in
+    logarithmic time."""
+
+    LARGEST = False
+    """Flag that is ``True`` when the heap is ordered from the largest
+    value"""
+
+    def __init__(self, source, func=None, equal=None, default=None, *,
+                 tracker=None, label=None):
+        self._default = default
+        super().__init__(source, func, equal, self.LARGEST, tracker=tracker,
+                         label=label)
+
+    def _result(self):
+        key = self._peek()
+        return self._default if key is missing else self._values[key]
+
+
+class Max(Min):
+    """The largest value, or `default` if there is none. It's updated in
+    logarithmic time."""
+
+    LARGEST = True
+
+
+class TopK(_HeapAggregate):
+    """The `k` items with the largest values, or the smallest ones if
+    `largest` is ``False``, as a list of ``(key, value)`` tuples in order.
+    It's updated in ``O(k log n)`` time.
+    """
+
+    def __init__(self, source, k, func=None, equal=None, largest=True, *,
+                 tracker=None, label=None):
+        self._k = k
+        super().__init__(source, func, equal, largest, tracker=tracker,
+                         label=label)
+
+    def _result(self):
+        values = self._values
+        return [(key, values[key]) for key in self._top(self._k)]
+
+
+__all__ = ('Aggregate', 'Count', 'Max', 'Mean', 'Min', 'Sum', 'TopK')
@@ -5,11 +5,16 @@
 # :License: GNU General Public License version 3 or later
 #
 
+import functools
+import weakref
+
 from . import get_tracker
 
 class Tracked:
     """A base class for objects that are Tracker-related"""
 
+    __slots__ = ('_tracker',)
+
     def __init__(self, *, tracker=None):
         if tracker is None:
             self._tracker = get_tracker
@@ -22,3 +27,34 @@ class Tracked:
         if callable(result):
             result = result()
         return result
+
+
+def weak_partial(func, instance, *args):
+    """Like `functools.partial`, with `instance` as the first argument, but
+    it doesn't keep the instance alive. Calling the result after the instance
+    has been garbage collected raises `ReferenceError`."""
+    return functools.partial(_call_weakly, func, weakref.ref(instance), args)
+
+
+def _call_weakly(func, instance_ref, args, *more_args, **kwargs):
+    instance = instance_ref()
+    if instance is None:
+        raise ReferenceError("The instance has been garbage collected")
+    return func(instance, *args, *more_args, **kwargs)
+
+
+def qualified_name(func):
+    """Return the qualified name of a function, looking through partials,
+    including those made by :func:`weak_partial`, and callable wrappers."""
+    while isinstance(func, functools.partial):
+        if func.func is _call_weakly:
+            func = func.args[0]
+        else:
+            func = func.func
+    result = getattr(func, '__qualname__', None)
+    if result is None:
+        result = type(func).__qualname__
+    module = getattr(func, '__module__', None)
+    if module:
+        result = '{}.{}'.format(module, result)
+    return result
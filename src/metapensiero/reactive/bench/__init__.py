@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+# :Project: metapensiero.reactive -- benchmarks
+# :Created: ven 16 ott 2026 20:59:13 CEST
+# :Author:  agent <agent@local>
+# :License: GNU General Public License version 3 or later
+#
+
+"""A small benchmark suite covering the hot paths of the package. Each
+scenario is a function that builds a graph and returns the workload to be
+timed, together with the number of elementary operations it performs. Run
+it with::
+
+  python -m metapensiero.reactive.bench --help
+"""
+
+import collections
+import gc
+import json
+import logging
+import platform
+import statistics
+import time
+
+logger = logging.getLogger(__name__)
+
+
+Scenario = collections.namedtuple('Scenario', 'name func params doc')
+"""A registered benchmark scenario, ``params`` contains the default values
+of the parameters."""
+
+SCENARIOS = collections.OrderedDict()
+"""The registered scenarios, by name"""
+
+
+def scenario(name, **params):
+    """Decorator that registers a scenario. The function is called with the
+    parameters and it must return a tuple ``(workload, ops)``, where
+    ``workload`` is a callable taking no arguments that is timed and ``ops``
+    is the number of operations it performs on every call. If the workload
+    has a ``close`` attribute, it's called when the timing is complete to
+    release its resources.
+
+    :param name: the name of the scenario
+    :param \\*\\*params: the default parameters. Integer parameters are the
+      sizes of the scenario and are multiplied by the `scale` of the run
+    """
+    def register(func):
+        SCENARIOS[name] = Scenario(name, func, params,
+                                   ' '.join((func.__doc__ or '').split()))
+        return func
+    return register
+
+
+def _scale_params(params, scale):
+    return {k: (max(1, int(v * scale)) if type(v) is int else v)
+            for k, v in params.items()}
+
+
+def run_scenario(name, scale=1.0, repeat=5, **overrides):
+    """Run a single scenario.
+
+    :param name: the name of the scenario
+    :param scale: a factor applied to its sizes
+    :param repeat: how many times to time the workload
+    :param \\*\\*overrides: values that replace the default parameters,
+      they are not scaled
+    :returns: a dictionary with the parameters and the timings, in seconds
+    """
+    sc = SCENARIOS[name]
+    params = _scale_params(sc.params, scale)
+    params.update(overrides)
+    workload, ops = sc.func(**params)
+    timings = []
+    gc.collect()
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for i in range(repeat):
+            started = time.perf_counter()
+            workload()
+            timings.append(time.perf_counter() - started)
+    finally:
+        if gc_enabled:
+            gc.enable()
+        close = getattr(workload, 'close', None)
+        if close is not None:
+            close()
+    best = min(timings)
+    return dict(name=name, params=params, ops=ops, repeat=repeat,
+                best=best, mean=statistics.mean(timings),
+                ops_per_sec=(ops / best) if best > 0 else None)
+
+
+def run(names=None, scale=1.0, repeat=5):
+    """Run the given scenarios, or all of them.
+
+    :returns: a dictionary that can be serialized as JSON, with the results
+      keyed by scenario name
+    """
+    if names is None:
+        names = list(SCENARIOS)
+    results = collections.OrderedDict()
+    for name in names:
+        logger.info("Running scenario %r", name)
+        results[name] = run_scenario(name, scale, repeat)
+    return dict(package='metapensiero.reactive',
+                python=platform.python_version(),
+                implementation=platform.python_implementation(),
+                timestamp=time.time(), scale=scale, results=results)
+
+
+def compare(baseline, current, threshold=0.1):
+    """Compare two runs, as returned by :func:`run`.
+
+    :param threshold: the relative slowdown of the best timing above which
+      a scenario is considered regressed
+    :returns: a list of dictionaries, one for each scenario present in both
+      runs, with the ``ratio`` between the current and the baseline timings
+      and a ``regressed`` flag
+    """
+    result = []
+    for name, cur in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None or base['params'] != cur['params']:
+            continue
+        ratio = cur['best'] / base['best'] if base['best'] > 0 else 1.0
+        result.append(dict(name=name, baseline=base['best'],
+                           current=cur['best'], ratio=ratio,
+                           regressed=ratio > 1 + threshold))
+    return result
+
+
+def load(filename):
+    with open(filename, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def dump(results, filename):
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+
+from . import scenarios  # noqa: register the scenarios
+
+
+__all__ = ('SCENARIOS', 'compare', 'dump', 'load', 'run', 'run_scenario',
+           'scenario')
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# :Project: metapensiero.reactive -- benchmarks runner
+# :Created: ven 16 ott 2026 20:59:13 CEST
+# :Author:  agent <agent@local>
+# :License: GNU General Public License version 3 or later
+#
+
+import argparse
+import sys
+
+from . import SCENARIOS, compare, dump, load, run
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m metapensiero.reactive.bench',
+        description="Run the benchmarks of metapensiero.reactive.")
+    parser.add_argument('scenarios', nargs='*', metavar='SCENARIO',
+                        help="the scenarios to run, all by default")
+    parser.add_argument('-l', '--list', action='store_true',
+                        help="list the available scenarios and exit")
+    parser.add_argument('-s', '--scale', type=float, default=1.0,
+                        help="factor applied to the sizes of the scenarios")
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help="how many times each workload is timed")
+    parser.add_argument('-o', '--output',
+                        help="write the results to this JSON file")
+    parser.add_argument('-c', '--compare', metavar='BASELINE',
+                        help="compare the results with those in this JSON "
+                        "file and exit with status 1 if any regressed")
+    parser.add_argument('-t', '--threshold', type=float, default=0.1,
+                        help="relative slowdown considered a regression, "
+                        "0.1 by default")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for sc in SCENARIOS.values():
+            params = ', '.join('{}={}'.format(k, v)
+                               for k, v in sc.params.items())
+            print('{:<20} {}\n{:<20} {}'.format(sc.name, sc.doc, '', params))
+        return 0
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error("unknown scenarios: {}".format(', '.join(
+            sorted(unknown))))
+
+    results = run(args.scenarios or None, args.scale, args.repeat)
+    for res in results['results'].values():
+        print('{:<20} best {:>10.3f} ms  mean {:>10.3f} ms  {:>12.0f} ops/s'
+              .format(res['name'], res['best'] * 1000, res['mean'] * 1000,
+                      res['ops_per_sec'] or 0))
+    if args.output:
+        dump(results, args.output)
+    status = 0
+    if args.compare:
+        for cmp in compare(load(args.compare), results, args.threshold):
+            print('{:<20} {:>7.2f}x {}'.format(
+                cmp['name'], cmp['ratio'],
+                'REGRESSED' if cmp['regressed'] else 'ok'))
+            if cmp['regressed']:
+                status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+# :Project: metapensiero.reactive -- benchmark scenarios
+# :Created: ven 16 ott 2026 20:59:13 CEST
+# :Author:  agent <agent@local>
+# :License: GNU General Public License version 3 or later
+#
+
+import asyncio
+import functools
+import itertools
+
+from ..dependency import Dependency
+from ..dict import ReactiveDict
+from ..flush.asyncio import AsyncioFlushManager
+from ..stream_utils import Selector, Tee
+from ..tracker import Tracker
+from ..value import Value
+from . import scenario
+
+
+class _Graph:
+    """A tracker with an asyncio flusher driven on its own loop, so that
+    the workloads can run each flush to its end and include the whole
+    propagation."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.tracker = Tracker(functools.partial(AsyncioFlushManager,
+                                                 loop=self.loop))
+
+    def flush(self):
+        """Run the loop until the scheduled flush, if any, is complete."""
+        future = self.tracker.flusher._flush_future
+        if future is not None:
+            self.loop.run_until_complete(future)
+
+    def workload(self, func, comps, recomputes):
+        """Decorate the workload of a scenario with the attributes used by
+        the tests to check it.
+
+        :param comps: the computations, kept alive by the workload
+        :param recomputes: how many recomputations each call performs
+        """
+        func.comps = comps
+        func.tracker = self.tracker
+        func.recomputes = recomputes
+        func.close = self.loop.close
+        return func
+
+
+@scenario('fan_out', width=10000, changes=10)
+def fan_out(width, changes):
+    """A single value read by many computations."""
+    g = _Graph()
+    t = g.tracker
+    source = Value(0, tracker=t)
+    comps = [t.reactive(lambda c: source.value) for i in range(width)]
+    counter = itertools.count(1)
+
+    def workload():
+        for i in range(changes):
+            source.value = next(counter)
+            g.flush()
+
+    return g.workload(workload, comps, width * changes), width * changes
+
+
+@scenario('generator_fan_out', width=10000, changes=10)
+def generator_fan_out(width, changes):
+    """A value calculated by a generator and read by many computations."""
+    g = _Graph()
+    t = g.tracker
+    source = Value(0, tracker=t)
+    derived = Value(lambda: source.value + 1, tracker=t)
+    comps = [t.reactive(lambda c: derived.value) for i in range(width)]
+    counter = itertools.count(1)
+
+    def workload():
+        for i in range(changes):
+            source.value = next(counter)
+            g.flush()
+
+    # the computation of the generator is recomputed too
+    return (g.workload(workload, comps, (width + 1) * changes),
+            width * changes)
+
+
+@scenario('deep_chain', depth=1000, changes=10)
+def deep_chain(depth, changes):
+    """A chain of computations, each one reading the value written by the
+    previous."""
+    g = _Graph()
+    t = g.tracker
+    values = [Value(0, tracker=t) for i in range(depth + 1)]
+
+    def link(i, comp):
+        values[i + 1].value = values[i].value + 1
+
+    comps = [t.reactive(functools.partial(link, i)) for i in range(depth)]
+    counter = itertools.count(1)
+
+    def workload():
+        for i in range(changes):
+            values[0].value = next(counter)
+            g.flush()
+
+    return g.workload(workload, comps, depth * changes), depth * changes
+
+
+@scenario('diamond', width=1000, changes=10)
+def diamond(width, changes):
+    """A value read by many computations whose results are all read by a
+    single one, which has to be recomputed only once per change."""
+    g = _Graph()
+    t = g.tracker
+    source = Value(0, tracker=t)
+    middles = [Value(0, tracker=t) for i in range(width)]
+
+    def middle(i, comp):
+        middles[i].value = source.value + i
+
+    comps = [t.reactive(functools.partial(middle, i)) for i in range(width)]
+    comps.append(t.reactive(lambda c: sum(m.value for m in middles)))
+    counter = itertools.count(1)
+
+    def workload():
+        for i in range(changes):
+            source.value = next(counter)
+            g.flush()
+
+    ops = (width + 1) * changes
+    return g.workload(workload, comps, ops), ops
+
+
+@scenario('retrack', dependencies=10000, changes=10)
+def retrack(dependencies, changes):
+    """A computation that depends on many dependencies, re-run when any of
+    them changes. It stresses ``Dependency.depend`` and the bookkeeping of
+    the dependencies of the computation."""
+    g = _Graph()
+    t = g.tracker
+    deps = [Dependency(tracker=t) for i in range(dependencies)]
+
+    def read_all(comp):
+        for dep in deps:
+            dep.depend()
+
+    comp = t.reactive(read_all)
+
+    def workload():
+        for i in range(changes):
+            deps[i % dependencies].changed()
+            g.flush()
+
+    return (g.workload(workload, [comp], changes),
+            dependencies * changes)
+
+
+@scenario('dict_updates', keys=1000000, readers=1000, updates=10000)
+def dict_updates(keys, readers, updates):
+    """A big dictionary with some of its keys read by computations, updated
+    key by key."""
+    g = _Graph()
+    t = g.tracker
+    rdict = ReactiveDict(tracker=t)
+    with t.batch():
+        rdict.update((k, 0) for k in range(keys))
+    g.flush()
+    step = max(1, keys // readers)
+    comps = [t.reactive(functools.partial(lambda k, c: rdict[k], k))
+             for k in range(0, keys, step)]
+    counter = itertools.count(1)
+
+    def workload():
+        for k in range(0, updates * step, step):
+            rdict[k % keys] = next(counter)
+            g.flush()
+
+    return g.workload(workload, comps, updates), updates
+
+
+async def _produce(items):
+    for i in range(items):
+        yield i
+        if i % 100 == 0:
+            await asyncio.sleep(0)
+
+
+async def _consume(aiterable):
+    count = 0
+    async for el in aiterable:
+        count += 1
+    return count
+
+
+def _run_loop(coro_factory):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro_factory(loop))
+    finally:
+        loop.close()
+
+
+@scenario('tee_consumers', consumers=100, items=1000)
+def tee_consumers(consumers, items):
+    """A :class:`~.stream_utils.Tee` distributing the items of a source to
+    many consumers."""
+
+    async def main(loop):
+        tee = Tee(functools.partial(_produce, items), loop=loop)
+        return await asyncio.gather(*[_consume(tee)
+                                      for i in range(consumers)])
+
+    def workload():
+        _run_loop(main)
+
+    return workload, consumers * items
+
+
+@scenario('selector_sources', sources=100, items=100)
+def selector_sources(sources, items):
+    """A :class:`~.stream_utils.Selector` merging many sources."""
+
+    async def main(loop):
+        selector = Selector(*[functools.partial(_produce, items)
+                              for i in range(sources)], loop=loop)
+        return await _consume(selector)
+
+    def workload():
+        _run_loop(main)
+
+    return workload, sources * items
@@ -6,14 +6,18 @@
 # :Copyright: Copyright (C) 2016 Alberto Berti
 #
 
+import asyncio
+import enum
 import functools
 import logging
 import operator
+import time
 import weakref
 
 from metapensiero import signal
 
-from .base import Tracked
+from .base import Tracked, qualified_name, weak_partial
+from .dependency import Coalesced, EventDependency
 from .exception import ReactiveError
 from . import undefined
 
@@ -21,19 +25,65 @@ from . import undefined
 logger = logging.getLogger(__name__)
 
 
+PRIORITY = enum.IntEnum('Priority', 'HIGH NORMAL LOW')
+"""The priority lanes of the computations. The flusher recomputes the
+computations in the ``HIGH`` lane first and those in the ``LOW`` lane last.
+The computations producing the values read by a computation are promoted to
+its lane, so that they are still recomputed before it."""
+
+
 class BaseComputation(Tracked, metaclass=signal.SignalAndHandlerInitMeta):
+    """The base of all the computations. Its instances have no instance
+    dictionary, subclasses have to declare their members in ``__slots__`` to
+    keep them compact. The signals are created lazily by the signal machinery
+    on first access.
+
+    On a 64-bit CPython an instance takes :data:`MEMORY_BUDGET` bytes, not
+    counting the mapping of its dependencies, that grows with their number.
+    """
 
-    invalidated = False
-    """If it's invalidated, it needs re-computing"""
+    __slots__ = ('invalidated', 'stopped', 'label', '_priority', '_lane',
+                 '_height', '_parent', '_dependencies', '_produced', '_func',
+                 '_owner', '__weakref__')
 
-    stopped = False
-    """Is this computation completely disabled"""
+    MEMORY_BUDGET = 136
+    """Maximum size in bytes of an instance, as measured by `sys.getsizeof`
+    on the instance alone. Each subclass adding members has its own."""
 
-    def __init__(self, parent=None, *, tracker=None):
+    def __init__(self, parent=None, *, tracker=None, owner=None, label=None,
+                 priority=None):
         super().__init__(tracker=tracker)
-        self.tracker._computations.add(self)
+        self.invalidated = False
+        """If it's invalidated, it needs re-computing"""
+        self.stopped = False
+        """Is this computation completely disabled"""
+        self._lane = PRIORITY.NORMAL if priority is None else priority
+        """The priority lane requested for this computation"""
+        self._priority = self._lane
+        """The effective priority, see :attr:`priority`"""
+        self.label = label
+        """An optional descriptive name, see :attr:`name`"""
+        self._height = 0
+        """The depth of this computation in the dependency graph. It's one
+        more than the highest of the dependencies it reads and it's used by
+        the flusher to recompute the computations in topological order."""
+        self._produced = None
+        """The dependencies changed by this computation while running, whose
+        height follows the one of this computation"""
+        self._func = None
+        self._owner = (None if owner is None else
+                       weakref.ref(owner, self._on_owner_collected))
+        """A weak reference to the object owning this computation. When it's
+        garbage collected this computation is stopped"""
+        tracker = self.tracker
+        tracker._computations.add(self)
+        tracker._registered += 1
         self._parent = parent
         """The parent computation"""
+        self._dependencies = {}
+        """The dependencies collected during the last run, mapped to the
+        version they had when first read. They are kept between runs so that
+        only the edges that were added or dropped need to be updated"""
 
     @signal.signal
     def on_invalidate(self):
@@ -76,6 +126,66 @@ class BaseComputation(Tracked, metaclass=signal.SignalAndHandlerInitMeta):
                                              repr(self._func),
                                              id(self))
 
+    @property
+    def name(self):
+        """The name of this computation, used by the diagnostic tools. It's
+        the :attr:`label`, if set, or the qualified name of the function."""
+        if self.label is not None:
+            return self.label
+        return qualified_name(self._func)
+
+    @property
+    def priority(self):
+        """The priority lane of this computation. Pending computations with a
+        higher priority are recomputed first by the flusher, even before
+        those with a lower height. It's the lane set on the computation or
+        the highest lane among the readers of the dependencies it produces,
+        if higher."""
+        return self._priority
+
+    @priority.setter
+    def priority(self, lane):
+        self._lane = lane
+        self._update_priority()
+
+    def _promote(self, priority):
+        """Raise the priority of this computation to the given one, if
+        higher."""
+        if priority < self._priority:
+            self._set_priority(priority)
+
+    def _set_priority(self, priority):
+        """Change the effective priority and propagate it to the producers
+        of the dependencies read by this computation."""
+        old = self._priority
+        if priority == old:
+            return
+        self._priority = priority
+        tracker = self.tracker
+        if tracker is not None:
+            tracker.flusher.update_computation(self)
+        for dep in tuple(self._dependencies):
+            producer = dep._producer
+            if producer is None or producer is self:
+                continue
+            if priority < old:
+                producer._promote(priority)
+            elif producer._priority == old:
+                producer._update_priority()
+
+    def _update_priority(self):
+        """Calculate the effective priority from scratch, looking at the
+        readers of the dependencies produced by this computation. This
+        happens only when the lane is changed or when a reader that may
+        have promoted this computation goes away."""
+        priority = self._lane
+        for dep in self._produced or ():
+            if dep._producer is self:
+                for comp in dep._dependents:
+                    if comp is not self and comp._priority < priority:
+                        priority = comp._priority
+        self._set_priority(priority)
+
     @property
     def _needs_recompute(self):
         return self.invalidated and not self.stopped
@@ -93,11 +203,41 @@ class BaseComputation(Tracked, metaclass=signal.SignalAndHandlerInitMeta):
         """
         self.stop()
 
+    def _on_owner_collected(self, owner_ref):
+        """Called when the owner is garbage collected. It doesn't stop the
+        computation directly, as the garbage collector may run at any time,
+        but delegates it to the tracker."""
+        tracker = self.tracker
+        if tracker is not None:
+            tracker._orphaned.append(self)
+
+    def _untrack(self, dependencies):
+        """Remove this computation from the dependents of the given
+        dependencies."""
+        for dep in dependencies:
+            dep._remove_dependent(self)
+
+    def _inputs_unchanged(self):
+        """Return ``True`` if all the dependencies read by the last run still
+        have the version observed then."""
+        for dep, version in self._dependencies.items():
+            if dep._version != version:
+                return False
+        return len(self._dependencies) > 0
+
     def add_dependency(self, dependency):
-        """Optional method called by the dependencies that are collected. It
-        does nothing here. A subclass may find useful to collect them.
+        """Method called by the dependencies each time they are depended
+        on. It collects them, with the version observed by the first read,
+        and updates the height of this computation.
         """
-        pass
+        if dependency not in self._dependencies:
+            self._dependencies[dependency] = dependency._version
+        height = dependency._height + 1
+        if height > self._height:
+            self._height = height
+            if self._produced:
+                for dep in tuple(self._produced):
+                    dep._raise_height(height)
 
     def invalidate(self, dependency=None):
         """Invalidate the current state of this computation"""
@@ -114,7 +254,16 @@ class BaseComputation(Tracked, metaclass=signal.SignalAndHandlerInitMeta):
         if not self.stopped:
             self.stopped = True
             self.invalidate()
-            self.tracker._computations.remove(self)
+            tracker = self.tracker
+            tracker._computations.remove(self)
+            tracker._unregistered += 1
+            tracker.flusher.remove_computation(self)
+            self._untrack(self._dependencies)
+            self._dependencies = {}
+            for dep in self._produced or ():
+                if dep._producer is self:
+                    dep._producer = None
+            self._produced = None
             self._func = None
             self._tracker = None
 
@@ -125,25 +274,31 @@ class Computation(BaseComputation):
     itself as the first argument to the function being run.
     """
 
-    first_run = False
-    """Is this computation the first?"""
+    __slots__ = ('first_run', 'guard', '_recomputing', '_skippable')
 
-    guard = None
-    """A callable that is called when invalidation triggers. It the result is
-    ``False``, then the computation will not be added to the to-be-recomputed
-    list in the flusher.
-    """
+    MEMORY_BUDGET = 168
 
     on_error = signal.Signal()
     """A signal that is notified when a computation results in an error."""
 
-    def __init__(self, parent, func, on_error=None, *, tracker=None):
-        super().__init__(parent, tracker=tracker)
+    def __init__(self, parent, func, on_error=None, *, tracker=None,
+                 owner=None, label=None, priority=None):
+        super().__init__(parent, tracker=tracker, owner=owner, label=label,
+                         priority=priority)
         self.first_run = True
+        """Is this computation the first?"""
+        self.guard = None
+        """A callable that is called when invalidation triggers. It the result
+        is ``False``, then the computation will not be added to the
+        to-be-recomputed list in the flusher.
+        """
         self._func = func
         """the function to execute"""
         self._recomputing = False
         """True when a computation is re-running"""
+        self._skippable = False
+        """True when the recomputation can be skipped if the dependencies
+        turn out to be unchanged"""
         if on_error:
             self.on_error.connect(on_error)
         errored = False
@@ -164,12 +319,35 @@ class Computation(BaseComputation):
         """Run the computation and reset the invalidation."""
         self.first_run = first_run
         self.invalidated = False
-        with self.tracker.while_compute(self):
-            self._func(self)
+        previous = self._dependencies
+        self._dependencies = {}
+        tracker = self.tracker
+        profiler = tracker._profiler
+        if profiler is not None:
+            started = time.perf_counter()
+        try:
+            with tracker.while_compute(self):
+                self._func(self)
+        finally:
+            # only the dependencies not read again lose this dependent
+            self._untrack(previous.keys() - self._dependencies.keys())
+            if profiler is not None:
+                profiler.computed(self, time.perf_counter() - started)
 
     def _recompute(self):
-        """Re-run the compute function and handle errors."""
+        """Re-run the compute function and handle errors. If the
+        dependencies still have the versions read by the last run, like when
+        a value has been changed and then set back to its previous value,
+        the computation is just marked as valid again."""
         if self._needs_recompute:
+            stats = self.tracker.stats
+            if self._skippable and self._inputs_unchanged():
+                self.invalidated = False
+                if stats is not None:
+                    stats.skipped += 1
+                return
+            if stats is not None:
+                stats.recomputes += 1
             try:
                 self._recomputing = True
                 self._compute()
@@ -184,23 +362,130 @@ class Computation(BaseComputation):
 
     def invalidate(self, dependency=None):
         """Invalidate the current state of this computation."""
-        guard = self.guard
-        if guard is not None and self._parent is not None:
-            raise ReactiveError("The guard cannot be used with parent")
-        elif guard is not None:
-            recomputing_allowed = self.guard(self)
-        else:
-            recomputing_allowed = True
         if not self.invalidated:
+            guard = self.guard
+            if guard is not None and self._parent is not None:
+                raise ReactiveError("The guard cannot be used with parent")
+            elif self._owner is not None and self._owner() is None:
+                # orphaned, waiting to be stopped
+                recomputing_allowed = False
+            elif guard is not None:
+                recomputing_allowed = self.guard(self)
+            else:
+                recomputing_allowed = True
+            # skipping the recomputation is safe only if nobody else has
+            # been notified of the invalidation
+            self._skippable = (dependency is not None and
+                               len(self.on_invalidate.subscribers) == 0)
+            tracker = self.tracker
+            if tracker.stats is not None:
+                tracker.stats.invalidations += 1
+            if tracker._profiler is not None:
+                tracker._profiler.invalidated(self, dependency)
             self.on_invalidate.notify()
             if not (self._recomputing or self.stopped) and recomputing_allowed:
-                flusher = self.tracker.flusher
+                flusher = tracker.flusher
                 flusher.add_computation(self)
                 flusher.require_flush()
+        elif dependency is None:
+            self._skippable = False
 
         super(Computation, self).invalidate(dependency)
 
 
+class IncrementalComputation(Computation):
+    """A computation whose function receives, besides the computation
+    itself, the changes of its dependencies since the previous run, so that
+    it can update its result instead of calculating it from scratch.
+
+    To create an instance of this class call the
+    :meth:`.tracker.Tracker.incremental` method.
+
+    The changes are a dictionary that maps each dependency that has changed
+    to the list of the payloads of its changes, in order. Only the
+    :class:`~.dependency.EventDependency` instances have payloads, each one
+    being the tuple of the values passed to their ``changed()`` method, like
+    ``((operator.setitem, (rdict, key, value)),)`` for the changes of a
+    :class:`~.dict.ReactiveDict`. The list is empty for the others. The
+    source of a dependency, if any, is available as its ``source`` member.
+
+    The changes are ``None`` on the first run and when the computation has
+    been invalidated explicitly, meaning that the result has to be
+    calculated from scratch.
+    """
+
+    __slots__ = ('_changes', '_handlers', '_incremental')
+
+    def __init__(self, parent, func, on_error=None, *, tracker=None,
+                 owner=None, label=None, priority=None):
+        self._changes = None
+        """The changes collected since the last run"""
+        self._handlers = None
+        """The handlers connected to the `on_change` signal of the event
+        dependencies, to collect the payloads"""
+        self._incremental = func
+        super().__init__(parent, weak_partial(type(self)._run, self),
+                         on_error, tracker=tracker, owner=owner,
+                         label=label or qualified_name(func),
+                         priority=priority)
+
+    def _run(self, comp):
+        changes, self._changes = self._changes, {}
+        self._incremental(self, changes)
+
+    def _on_payload(self, dependency, *values):
+        changes = self._changes
+        if changes is not None:
+            payloads = changes.setdefault(dependency, [])
+            if len(values) == 1 and isinstance(values[0], Coalesced):
+                payloads.extend(values[0])
+            else:
+                payloads.append(values)
+
+    def _recompute(self):
+        if (self._needs_recompute and self._skippable and
+                self._inputs_unchanged()):
+            # it will be skipped, the dependencies went back to the versions
+            # read by the last run
+            self._changes = {}
+        super()._recompute()
+
+    def _untrack(self, dependencies):
+        super()._untrack(dependencies)
+        handlers = self._handlers
+        if handlers:
+            for dep in dependencies:
+                handler = handlers.pop(dep, None)
+                if handler is not None:
+                    dep.on_change.disconnect(handler)
+
+    def add_dependency(self, dependency):
+        super().add_dependency(dependency)
+        if isinstance(dependency, EventDependency):
+            handlers = self._handlers
+            if handlers is None:
+                handlers = self._handlers = {}
+            if dependency not in handlers:
+                handler = handlers[dependency] = functools.partial(
+                    self._on_payload, dependency)
+                dependency.on_change.connect(handler)
+
+    def invalidate(self, dependency=None):
+        """Invalidate the current state of this computation, recording the
+        dependency that has changed."""
+        changes = self._changes
+        if changes is not None:
+            if dependency is None:
+                self._changes = None
+            elif dependency not in changes:
+                changes[dependency] = []
+        super().invalidate(dependency)
+
+    def stop(self):
+        super().stop()
+        self._incremental = None
+
+
 class _Wrapper(Tracked):
     """A small class to help wrapping methods and to keep computations."""
 
@@ -215,9 +500,11 @@ class _Wrapper(Tracked):
 
     def __call__(self, instance):
         comp = self.computations.get(instance)
-        if comp is None or (comp is not None and comp.stopped()):
-            comp = self.tracker.reactive(functools.partial(self.wrapped,
-                                                           instance))
+        if comp is None or comp.stopped:
+            # the computation must not keep the instance alive
+            comp = self.tracker.reactive(weak_partial(self.wrapped, instance),
+                                         owner=instance)
+            self.computations[instance] = comp
         return comp
 
     def __delete__(self, instance):
@@ -351,3 +638,136 @@ class AsyncComputation(Computation):
 
     def _init_next_value_container(self):
         self._next = self._tracker.loop.create_future()
+
+
+class _TrackedSteps:
+    """Awaitable that drives a coroutine step by step, making its computation
+    the current one while each step runs. In this way the dependencies read
+    by the coroutine are tracked even after it has awaited something, while
+    anything else running in the meantime is not."""
+
+    __slots__ = ('computation', 'coro')
+
+    def __init__(self, computation, coro):
+        self.computation = computation
+        self.coro = coro
+
+    def __await__(self):
+        comp = self.computation
+        coro = self.coro
+        value = exc = None
+        while True:
+            tracker = comp.tracker
+            if tracker is None:
+                # stopped
+                coro.close()
+                raise asyncio.CancelledError()
+            with tracker.while_compute(comp):
+                try:
+                    if exc is None:
+                        yielded = coro.send(value)
+                    else:
+                        yielded = coro.throw(exc)
+                except StopIteration as e:
+                    return e.value
+            try:
+                value = yield yielded
+                exc = None
+            except GeneratorExit:
+                coro.close()
+                raise
+            except BaseException as e:
+                value = None
+                exc = e
+
+
+class CoroutineComputation(Computation):
+    """A computation whose function is a coroutine function, so that it can
+    ``await`` between the reads of its dependencies.
+
+    To create an instance of this class call the
+    :meth:`.tracker.Tracker.async_autorun` method.
+
+    Each run is executed in an asyncio task and the dependencies are tracked
+    only while the coroutine is running, not while it's suspended. When the
+    computation is invalidated while a run is still suspended, that run is
+    cancelled and a new one is started by the flusher. The dependencies read
+    by a cancelled run are kept until a run completes.
+
+    Errors raised by a run are notified to the `on_error` signal or logged,
+    as there is no caller to raise them to.
+    """
+
+    __slots__ = ('_task', '_run_deps')
+
+    def __init__(self, parent, func, on_error=None, *, tracker=None,
+                 owner=None, label=None, priority=None):
+        self._task = None
+        self._run_deps = None
+        super().__init__(parent, func, on_error, tracker=tracker,
+                         owner=owner, label=label, priority=priority)
+
+    @property
+    def task(self):
+        """The asyncio task executing the last run."""
+        return self._task
+
+    def _cancel(self):
+        task = self._task
+        if task is not None and not task.done():
+            task.cancel()
+
+    def _compute(self, first_run=False):
+        """Start a new run in a task, cancelling the previous one if it's
+        still running."""
+        self.first_run = first_run
+        self.invalidated = False
+        self._cancel()
+        loop = self.tracker.loop
+        if loop is None:
+            raise ReactiveError("Coroutine computations need a flusher with "
+                                "an asyncio loop")
+        run_deps = self._run_deps = {}
+        coro = _TrackedSteps(self, self._func(self))
+        self._task = loop.create_task(self._run(coro, run_deps))
+
+    async def _run(self, coro, run_deps):
+        try:
+            await coro
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if len(self.on_error.subscribers) > 0:
+                self.on_error.notify(self, e)
+            else:
+                logger.exception("Error while running a coroutine "
+                                 "computation")
+        else:
+            if not self.stopped and run_deps is self._run_deps:
+                # only the dependencies not read by this run lose this
+                # dependent
+                self._untrack(self._dependencies.keys() - run_deps.keys())
+                self._dependencies = run_deps
+
+    def _inputs_unchanged(self):
+        # the versions are reliable only when the last run is complete
+        task = self._task
+        return (task is not None and task.done() and not task.cancelled() and
+                super()._inputs_unchanged())
+
+    def add_dependency(self, dependency):
+        # keep all the dependencies tracked until a run completes
+        super().add_dependency(dependency)
+        run_deps = self._run_deps
+        if run_deps is not None and dependency not in run_deps:
+            run_deps[dependency] = dependency._version
+
+    def invalidate(self, dependency=None):
+        """Invalidate the current state of this computation, cancelling the
+        run in progress, if any."""
+        self._cancel()
+        super().invalidate(dependency)
+
+    def stop(self):
+        self._cancel()
+        super().stop()
@@ -10,7 +10,9 @@ import abc
 import collections
 import collections.abc
 import functools
+import itertools
 import logging
+import operator
 from weakref import WeakKeyDictionary
 
 from metapensiero import signal
@@ -20,13 +22,52 @@ from .stream_utils import Selector, Sink, Tee, Transformer
 
 logger = logging.getLogger(__name__)
 
+_versions = itertools.count(1)
+"""Global source of dependency versions, so that each version is never
+reused."""
 
-class Dependency(Tracked):
 
-    def __init__(self, source=None, *, tracker=None):
+class Dependency(Tracked):
+    """The basic element of the dependency graph, it tracks the computations
+    that depend on some value/state/object and invalidates them when it
+    changes.
+
+    Being the most numerous objects in a graph, instances are kept small:
+    they have no instance dictionary and the dependents are kept in a tuple
+    as long as they are one or two, switching to a set only beyond that. On
+    a 64-bit CPython an instance takes :data:`MEMORY_BUDGET` bytes, including
+    the container of up to two dependents.
+    """
+
+    __slots__ = ('label', '_dependents', '_source', '_height', '_version',
+                 '_base', '_producer')
+
+    MEMORY_BUDGET = 152
+    """Maximum size in bytes of an instance with no more than two dependents,
+    as measured by `sys.getsizeof` on the instance plus its container of
+    dependents."""
+
+    def __init__(self, source=None, *, tracker=None, label=None):
         super().__init__(tracker=tracker)
-        self._dependents = set()
+        self.label = label
+        """An optional descriptive name, see :attr:`name`"""
+        self._dependents = ()
         self._source = source
+        self._height = 0
+        """The height of the highest computation that has changed this
+        dependency while running. Computations depending on this will have a
+        greater height."""
+        self._version = 0
+        """Incremented on every change, the computations record the version
+        they observe to detect if it's really changed when they are
+        recomputed."""
+        self._producer = None
+        """The computation that produces the value/state tracked by this
+        instance, if known, see :meth:`_produced_by`"""
+        self._base = None
+        """Version and value at the first change of the current flush cycle,
+        used by :meth:`value_changed`. It's reset by the flusher at the end
+        of the cycle, so that the old value isn't kept alive"""
 
     def depend(self, computation=None):
         """Used to declare the dependency of a computation on an instance of this
@@ -35,32 +76,82 @@ class Dependency(Tracked):
         implicit mode, the dependency finds the running computation by asking
         the `Tracker`.
         """
-        if not (computation or self.tracker.active):
+        tracker = self.tracker
+        if not (computation or tracker.active):
             result = False
         else:
-            computation = computation or self.tracker.current_computation
-            if computation not in self._dependents:
-                self._dependents.add(computation)
-                computation.add_dependency(self)
-                computation.on_invalidate.connect(
-                    self._on_computation_invalidate
-                )
-                result = True
-            else:
+            computation = computation or tracker.current_computation
+            stats = tracker.stats
+            if stats is not None:
+                stats.depends += 1
+            if computation.stopped:
                 result = False
+            else:
+                computation.add_dependency(self)
+                if computation not in self._dependents:
+                    self._add_dependent(computation)
+                    result = True
+                else:
+                    result = False
         return result
 
     __call__ = depend
 
-    def _on_computation_invalidate(self, computation):
-        self._dependents.remove(computation)
+    def _add_dependent(self, computation):
+        deps = self._dependents
+        if type(deps) is tuple:
+            if len(deps) < 2:
+                self._dependents = deps + (computation,)
+            else:
+                self._dependents = set(deps)
+                self._dependents.add(computation)
+        else:
+            deps.add(computation)
+        producer = self._producer
+        if producer is not None and producer is not computation:
+            producer._promote(computation._priority)
+
+    def _remove_dependent(self, computation):
+        deps = self._dependents
+        if type(deps) is tuple:
+            if computation in deps:
+                self._dependents = tuple(c for c in deps
+                                         if c is not computation)
+        else:
+            deps.discard(computation)
+            if len(deps) <= 2:
+                self._dependents = tuple(deps)
+        producer = self._producer
+        if (producer is not None and producer is not computation and
+                producer._priority == computation._priority and
+                producer._priority < producer._lane):
+            # it may have been the reader that promoted the producer
+            producer._update_priority()
 
     def changed(self):
         """This is called to declare that value/state/object that this instance
         represents has changed. It will notify every computation that was
         calculating when was called `depend` on it.
         """
+        if not self._record_change():
+            self._invalidate_dependents()
+
+    def _commit(self, payloads, coalesce=False):
+        """Apply the changes collected by a batch, see
+        :meth:`~.tracker.Tracker.batch`. The dependents are invalidated only
+        once.
+
+        :param payloads: the list of the payloads of the changes
+        :param coalesce: if ``True`` the payloads are notified at once, see
+          :class:`Coalesced`
+        """
+        self._invalidate_dependents()
+
+    def _invalidate_dependents(self):
         deps = self._dependents
+        stats = self.tracker.stats
+        if stats is not None:
+            stats.fanout.observe(len(deps))
         if len(deps) > 0:
             for comp in list(deps):
                 if comp.stopped:
@@ -68,13 +159,129 @@ class Dependency(Tracked):
                         'Refusing to invalidate an already'
                         ' stopped computation. This should not happen!')
                 comp.invalidate(self)
+            # even if the dependents are invalidated already, this is a
+            # request that a debouncing flusher has to know about
             self.tracker.flusher.require_flush()
 
+    def _record_change(self, values=None):
+        """Bookkeeping done on every change. Returns ``True`` if the change
+        has to be applied later because a batch is in progress or because it
+        comes from a thread other than the loop's one.
+
+        :param values: the payload of the change, if any
+        """
+        tracker = self.tracker
+        inbox = tracker._inbox
+        if inbox is not None and inbox.put(self, values):
+            # changed by another thread, it will be applied by the loop
+            return True
+        self._version = next(_versions)
+        if tracker.stats is not None:
+            tracker.stats.changes += 1
+        writer = tracker.current_computation
+        if writer is not None:
+            self._produced_by(writer)
+        batch = tracker._batch
+        if batch is not None:
+            batch.add(self, values)
+            return True
+        return False
+
+    def value_changed(self, old, new, equal=operator.eq):
+        """Like :meth:`changed`, for dependencies that track a value. If the
+        value goes back to the one it had at the start of the current flush
+        cycle, the version of that time is restored. In this way the
+        computations that have read the old value will skip their
+        recomputation.
+
+        :param old: the previous value
+        :param new: the new value
+        :param equal: the equality function
+        """
+        tracker = self.tracker
+        inbox = tracker._inbox
+        if inbox is not None and inbox.put(self):
+            return
+        base = self._base
+        if base is None:
+            if not self._dependents:
+                # no computation will be recomputed, nothing to skip
+                self.changed()
+                return
+            base = self._base = (self._version, old)
+            tracker.flusher._touched.append(self)
+        self.changed()
+        if equal(base[1], new):
+            self._version = base[0]
+
+    def _produced_by(self, computation):
+        """Declare that the given computation is the one that produces the
+        value/state tracked by this instance, so that the dependents of this
+        instance will be recomputed after it.
+
+        The computation is also promoted to the highest priority among the
+        dependents of this instance, so that it isn't left behind by its
+        readers in the queue of the flusher. The dependents are examined
+        only when the producer changes, afterwards each dependent is
+        compared with the producer when it's added and when its own
+        priority changes, and the producer is demoted when the last
+        dependent promoting it goes away.
+        """
+        produced = computation._produced
+        if produced is None:
+            produced = computation._produced = set()
+        produced.add(self)
+        if computation._height > self._height:
+            self._raise_height(computation._height)
+        old = self._producer
+        if old is not computation:
+            self._producer = computation
+            if old is not None and not old.stopped:
+                old._update_priority()
+            priority = computation._priority
+            for comp in self._dependents:
+                if comp is not computation and comp._priority < priority:
+                    priority = comp._priority
+            computation._promote(priority)
+
+    def _raise_height(self, height):
+        """Raise the height of this instance to the given one, raising in
+        turn the height of the computations downstream of it and updating
+        their position in the queue of the flusher if they are pending. Each
+        computation is raised at most once, to stop at the cycles."""
+        flusher = self.tracker.flusher
+        raised = set()
+        stack = [(self, height)]
+        while stack:
+            dep, height = stack.pop()
+            if height <= dep._height:
+                continue
+            dep._height = height
+            height += 1
+            for comp in tuple(dep._dependents):
+                if comp._height >= height or comp in raised:
+                    continue
+                raised.add(comp)
+                comp._height = height
+                flusher.update_computation(comp)
+                if comp._produced:
+                    stack.extend((d, height) for d in comp._produced)
+
     @property
     def has_dependents(self):
         """True if this dependency has any computation that depends on it."""
         return len(self._dependents) > 0
 
+    @property
+    def name(self):
+        """The name of this dependency, used by the diagnostic tools. It's
+        the :attr:`label`, if set, or the name of the type of the source."""
+        if self.label is not None:
+            return self.label
+        if self._source is not None:
+            return type(self._source).__qualname__
+        return type(self).__qualname__
+
     @property
     def source(self):
         """Return a possible connected object."""
@@ -86,6 +293,23 @@ class StopFollowingValue(Exception):
     single value."""
 
 
+class Coalesced(tuple):
+    """The payloads of the changes of a dependency collected by a coalescing
+    batch, see :meth:`~.tracker.Tracker.batch`. It's notified as the only
+    value of a single change event in place of one event for each payload,
+    and it contains all of them in order."""
+
+    __slots__ = ()
+
+
+def _send_payloads(dependency, payloads, coalesce):
+    if coalesce and len(payloads) > 1:
+        dependency.send(Coalesced(payloads))
+    else:
+        for values in payloads:
+            dependency.send(*values)
+
+
 class FollowMixin(abc.ABC):
 
     _source = None
@@ -137,8 +361,8 @@ class EventDependency(FollowMixin, Dependency,
 
     on_change = signal.Signal()
 
-    def __init__(self, source=None, *, tracker=None):
-        Dependency.__init__(self, source, tracker=tracker)
+    def __init__(self, source=None, *, tracker=None, label=None):
+        Dependency.__init__(self, source, tracker=tracker, label=label)
         FollowMixin.__init__(self)
 
     def _add_followed(self, followed, ftrans=None):
@@ -155,7 +379,11 @@ class EventDependency(FollowMixin, Dependency,
         followed.on_change.disconnect(cback)
 
     def _on_followed_changes(self, followed, *changes):
-        ftrans, cback = self._following[followed]
+        following = self._following.get(followed)
+        if following is None:
+            # unfollowed by another handler of the same change
+            return
+        ftrans, cback = following
         try:
             if ftrans:
                 changes = ftrans(*changes)
@@ -164,8 +392,13 @@ class EventDependency(FollowMixin, Dependency,
             pass
 
     def changed(self, *values):
-        super().changed()
-        self.send(*values)
+        if not self._record_change(values):
+            self._invalidate_dependents()
+            self.send(*values)
+
+    def _commit(self, payloads, coalesce=False):
+        self._invalidate_dependents()
+        _send_payloads(self, payloads, coalesce)
 
     def sink(self):
         return EventSink(self)
@@ -210,8 +443,8 @@ class StreamFollower(FollowMixin):
 
 class StreamDependency(StreamFollower, Dependency):
 
-    def __init__(self, source=None, *, tracker=None):
-        Dependency.__init__(self, source, tracker=tracker)
+    def __init__(self, source=None, *, tracker=None, label=None):
+        Dependency.__init__(self, source, tracker=tracker, label=label)
         StreamFollower.__init__(self)
         self._public_tee = Tee(self._follow_selector)
 
@@ -220,8 +453,13 @@ class StreamDependency(StreamFollower, Dependency):
         return super()._follow_handler(ftrans, *values)
 
     def changed(self, *values):
-        Dependency.changed(self)
-        self.send(*values)
+        if not self._record_change(values):
+            self._invalidate_dependents()
+            self.send(*values)
+
+    def _commit(self, payloads, coalesce=False):
+        self._invalidate_dependents()
+        _send_payloads(self, payloads, coalesce)
 
 
 class EventSink:
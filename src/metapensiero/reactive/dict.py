@@ -34,13 +34,20 @@ class ReactiveContainerBase(Tracked):
     def __init__(self, equal=None, *, tracker=None):
         super().__init__(tracker=tracker)
         self._equal = equal or operator.eq
-        self._all_reactives = EventDependency(tracker=self._tracker)
-        self._all_immutables = EventDependency(tracker=self._tracker)
-        self._all_values = EventDependency(tracker=self._tracker)
+        name = type(self).__qualname__
+        self._all_reactives = EventDependency(tracker=self._tracker,
+                                              label=name + '.all_reactives')
+        self._all_immutables = EventDependency(tracker=self._tracker,
+                                               label=name + '.all_immutables')
+        self._all_values = EventDependency(tracker=self._tracker,
+                                           label=name + '.all_values')
         self._all_values.follow(self._all_reactives, self._all_immutables)
-        self._structure = EventDependency(tracker=self._tracker)
-        self._all_structures = EventDependency(tracker=self._tracker)
-        self._all = EventDependency(tracker=self._tracker)
+        self._structure = EventDependency(tracker=self._tracker,
+                                          label=name + '.structure')
+        self._all_structures = EventDependency(tracker=self._tracker,
+                                               label=name + '.all_structures')
+        self._all = EventDependency(tracker=self._tracker,
+                                    label=name + '.all')
         self._all.follow(self._all_structures, self._all_reactives,
                          self._all_immutables)
         self._all_structures.follow(self._structure)
@@ -102,6 +109,12 @@ class ReactiveDict(collections.UserDict, ReactiveContainerBase):
 
     def __init__(self, *args, equal=None, tracker=None, **kwargs):
         self._key_dependencies = {}
+        self._indexes = None
+        """The secondary indexes, by name"""
+        self._followers = None
+        """The views and the other objects following the change events of
+        this dict, by id, see :class:`~.views.SourceFollower`. They are kept
+        alive here as the signals don't keep their subscribers alive"""
         ReactiveContainerBase.__init__(self, equal, tracker=tracker)
         collections.UserDict.__init__(self, *args, **kwargs)
 
@@ -119,7 +132,8 @@ class ReactiveDict(collections.UserDict, ReactiveContainerBase):
 
     def __getitem__(self, key):
         value = super().__getitem__(key)
-        self._key_dependencies[key].depend()
+        if self.tracker.active:
+            self._key_dependency(key).depend()
         return value
 
     def __iter__(self):
@@ -141,27 +155,28 @@ class ReactiveDict(collections.UserDict, ReactiveContainerBase):
         return partial(self._follow_transform, rvalue, key)
 
     def _change(self, key, oldv, newv):
-        """Analyze changed values and trigger changed events on dependencies."""
+        """Analyze changed values and trigger changed events on dependencies.
+        The per-key dependencies exist only for the keys that have been read
+        by a computation, the aggregate dependencies are fed directly."""
         if oldv is missing:
             # add
-            vdep = EventDependency(tracker=self._tracker)
-            self._key_dependencies[key] = vdep
+            change = (operator.setitem, (self, key, newv))
             if self._is_immutable(newv):
-                self._all_immutables.follow(vdep)
+                self._all_immutables.changed(change)
             else:
                 self._follow_reactive(newv, key=key)
-            change = (operator.setitem, (self, key, newv))
-            vdep.changed(change)
             self._structure.changed(change)
         elif newv is missing:
             # delete
-            vdep = self._key_dependencies.pop(key)
             change = (operator.delitem, (self, key))
-            vdep.changed(change)
+            vdep = self._key_dependencies.pop(key, None)
+            if vdep is not None:
+                vdep.changed(change)
+            was_immu = self._is_immutable(oldv)
+            if was_immu:
+                self._all_immutables.changed(change)
             self._structure.changed(change)
-            if self._is_immutable(oldv):
-                self._all_immutables.unfollow(vdep)
-            else:
+            if not was_immu:
                 self._follow_reactive(oldv, stop=True)
         else:
             # change
@@ -171,21 +186,116 @@ class ReactiveDict(collections.UserDict, ReactiveContainerBase):
             was_reactive = isinstance(oldv, ReactiveContainerBase)
             is_reactive = isinstance(newv, ReactiveContainerBase)
 
-            dep = self._key_dependencies[key]
             if was_reactive:
                 self._follow_reactive(oldv, stop=True)
             if is_reactive:
-                self._follow_reactive(newv)
-            dep.changed((operator.setitem, (self, key, newv)))
+                self._follow_reactive(newv, key=key)
+            change = (operator.setitem, (self, key, newv))
+            vdep = self._key_dependencies.get(key)
+            if vdep is not None:
+                vdep.changed(change)
+            if is_immu or self._is_immutable(oldv):
+                self._all_immutables.changed(change)
+            elif was_reactive or is_reactive:
+                self._all_reactives.changed(change)
 
     def _follow_transform(self, followed, key,  *changes):
         change = (operator.setitem, (self, key, followed))
         return (change,) + changes
 
+    def _key_dependency(self, key):
+        """Return the dependency tracking the value of the given key,
+        creating it if it doesn't exist yet."""
+        vdep = self._key_dependencies.get(key)
+        if vdep is None:
+            vdep = EventDependency(
+                tracker=self._tracker,
+                label='{}[{!r}]'.format(type(self).__qualname__, key))
+            self._key_dependencies[key] = vdep
+        return vdep
+
+    def create_index(self, name, keyfunc=None):
+        """Create a secondary index on the values, maintained incrementally,
+        that groups the keys by the result of `keyfunc` called on their
+        values. Computations reading a group of keys from the index are
+        invalidated only when its members change:
+
+        .. code:: python
+
+          users.create_index('status')
+
+          def show_active(comp):
+              for key in users.get_index('status')['active']:
+                  ...
+
+        :param name: the name of the index
+        :param keyfunc: a function taking a value and returning its group,
+          by default it reads the attribute with the same name of the index
+        :returns: an :class:`~.index.Index` instance
+        """
+        from .index import Index
+        if self._indexes is None:
+            self._indexes = {}
+        elif name in self._indexes:
+            raise ValueError("An index named {!r} exists already".format(
+                name))
+        index = self._indexes[name] = Index(self, name, keyfunc)
+        return index
+
+    def drop_index(self, name):
+        """Remove the secondary index with the given name."""
+        index = self._indexes.pop(name) if self._indexes else None
+        if index is None:
+            raise KeyError(name)
+        index.stop()
+
+    def filter(self, pred):
+        """Return a view with the items whose value satisfies `pred`, kept
+        up to date incrementally.
+
+        :returns: a :class:`~.views.FilteredView` instance
+        """
+        from .views import FilteredView
+        return FilteredView(self, pred)
+
+    def get_index(self, name):
+        """Return the secondary index with the given name, see
+        :meth:`create_index`."""
+        if not self._indexes:
+            raise KeyError(name)
+        return self._indexes[name]
+
+    def group_by(self, keyfunc):
+        """Return a view that groups the items by the result of `keyfunc`
+        called on their values, kept up to date incrementally.
+
+        :returns: a :class:`~.views.GroupedView` instance
+        """
+        from .views import GroupedView
+        return GroupedView(self, keyfunc)
+
     def keys(self):
         self._structure.depend()
         return super().keys()
 
+    def map(self, func):
+        """Return a view with the same keys and the values transformed by
+        `func`, kept up to date incrementally.
+
+        :returns: a :class:`~.views.MappedView` instance
+        """
+        from .views import MappedView
+        return MappedView(self, func)
+
+    def sorted(self, key=None, reverse=False):
+        """Return a view with the items in order of their values, or of the
+        result of `key` called on them, kept up to date incrementally.
+
+        :returns: a :class:`~.views.SortedView` instance
+        """
+        from .views import SortedView
+        return SortedView(self, key, reverse)
+
     def values(self):
         self._all_values.depend()
         return super().values()
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+# :Project: metapensiero.reactive -- offloading of computations to executors
+# :Created: ven 16 ott 2026 21:06:53 CEST
+# :Author:  agent <agent@local>
+# :License: GNU General Public License version 3 or later
+#
+
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import operator
+
+from . import undefined
+from .base import Tracked, qualified_name, weak_partial
+from .dependency import Dependency
+from .exception import ReactiveError
+
+logger = logging.getLogger(__name__)
+
+_default_executor = None
+
+
+def default_executor():
+    """Return the process pool shared by the offloaded values that do not
+    specify an executor, creating it on the first call. It has a worker
+    per CPU."""
+    global _default_executor
+    if _default_executor is None:
+        _default_executor = concurrent.futures.ProcessPoolExecutor()
+    return _default_executor
+
+
+class Offloaded(Tracked):
+    """A reactive value calculated by a pure function that runs in an
+    executor, by default a process pool, so that heavy calculations do not
+    block the event loop and can use all the cores.
+
+    The calculation is split in two parts: the `inputs` function runs on
+    the loop inside a computation and reads the reactive values the result
+    depends on, returning a *snapshot* of them. Then the snapshot is passed
+    to `func`, which runs in the executor. Both the snapshot and `func` must
+    be picklable when using a process pool, so the latter must be a module
+    level function.
+
+    When the result arrives it's committed as the value and the dependents
+    are invalidated, unless it's equal to the previous one according to
+    the `equal` function. When the inputs change again while a calculation
+    is in flight, its result is discarded as superseded and a new one is
+    submitted. Until the first result arrives the value is `initial_value`.
+    As the submission doesn't wait for the result, the values invalidated by
+    the same change are calculated in parallel.
+
+    Errors raised by `func` are passed to the `on_error` callback, if any,
+    together with this instance, otherwise they are logged. The value is
+    left unchanged.
+
+    :param inputs: a function without arguments returning the snapshot
+    :param func: the pure function, called with the snapshot
+    :param executor: an optional `concurrent.futures.Executor` instance,
+      by default the one returned by :func:`default_executor`. See also
+      :meth:`~.tracker.Tracker.threaded`
+    :param equal: an optional equality comparison function to be used
+      instead of the default ``operator.eq``
+    :param initial_value: the value until the first result arrives
+    :param on_error: an optional callback for the errors of `func`
+    :param label: an optional name for the value, used by the diagnostic
+      tools in place of the name of `func`
+    """
+
+    def __init__(self, inputs, func, executor=None, equal=None,
+                 initial_value=undefined, on_error=None, *, tracker=None,
+                 label=None):
+        super().__init__(tracker=tracker)
+        self._inputs = inputs
+        self._func = func
+        self._executor = executor
+        self._equal = equal or operator.eq
+        self._value = initial_value
+        self._on_error = on_error
+        self._label = label or qualified_name(func)
+        self._dep = Dependency(self, tracker=tracker, label=self._label)
+        self._generation = 0
+        """Incremented at every submission, identifies the current one"""
+        self._future = None
+        self._comp = None
+
+    def __call__(self):
+        return self.value
+
+    @property
+    def pending(self):
+        """``True`` while a calculation is in flight or its result hasn't
+        been committed yet."""
+        return self._future is not None
+
+    @property
+    def value(self):
+        if self._comp is None:
+            # the first read starts the tracking, and the calculation
+            self._comp = self.tracker.reactive(
+                weak_partial(type(self)._submit, self), with_parent=False,
+                owner=self, label=self._label)
+        if self.tracker.active:
+            self._dep._produced_by(self._comp)
+            self._dep.depend()
+        return self._value
+
+    def _submit(self, comp):
+        loop = self.tracker.loop
+        if loop is None:
+            raise ReactiveError("Offloaded values need a flusher with an "
+                                "asyncio loop")
+        snapshot = self._inputs()
+        if self._future is not None:
+            # it's useful only if the job hasn't been started yet
+            self._future.cancel()
+        self._generation += 1
+        executor = self._executor or default_executor()
+        self._future = future = loop.run_in_executor(executor, self._func,
+                                                     snapshot)
+        future.add_done_callback(functools.partial(self._commit,
+                                                   self._generation))
+
+    def _commit(self, generation, future):
+        if generation != self._generation:
+            logger.debug("Discarding superseded result of %r", self._label)
+            return
+        self._future = None
+        if future.cancelled():
+            return
+        exc = future.exception()
+        if exc is not None:
+            if self._on_error is not None:
+                self._on_error(self, exc)
+            else:
+                logger.error("Error while calculating %r", self._label,
+                             exc_info=exc)
+            return
+        new = future.result()
+        old = self._value
+        self._value = new
+        # unlike Value, the first result has to be notified too as it
+        # arrives after the first read
+        if old is undefined or not self._equal(old, new):
+            self._dep.value_changed(old, new, self._equal)
+
+    async def wait(self):
+        """Wait until no calculation is in flight and return the value."""
+        while self.pending:
+            await asyncio.wait([self._future])
+        return self._value
+
+    def stop(self):
+        """Stop tracking the inputs and discard the calculation in flight,
+        if any."""
+        comp = self._comp
+        if comp is not None:
+            self._comp = None
+            comp.stop()
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+        self._generation += 1
+
+
+__all__ = ('Offloaded', 'default_executor')
@@ -6,30 +6,175 @@
 #
 
 import asyncio
+import collections
 import logging
+import threading
+import time
 
+from ..computation import PRIORITY
 from .base import BaseFlushManager
 
 logger = logging.getLogger(__name__)
 
 
+class ThreadsafeInbox:
+    """Collects the changes of the dependencies made by threads other than
+    the one running the loop, see :class:`AsyncioFlushManager`. The changes
+    are appended to a deque, which is thread safe without locking, and the
+    loop is woken up only by the first change after each drain.
+
+    :param flusher: the :class:`AsyncioFlushManager` instance
+    """
+
+    def __init__(self, flusher):
+        self.flusher = flusher
+        self.thread_id = threading.get_ident()
+        """The identity of the thread running the loop. It's initially the
+        one creating the flusher and it's updated on every flush"""
+        self._queue = collections.deque()
+        self._scheduled = False
+
+    def __len__(self):
+        return len(self._queue)
+
+    def put(self, dependency, values=None):
+        """Enqueue the change of a dependency, if the current thread isn't
+        the one running the loop.
+
+        :param dependency: the changed :class:`~.dependency.Dependency`
+        :param values: the payload of the change, if any
+        :returns: ``True`` if the change has been enqueued
+        """
+        if threading.get_ident() == self.thread_id:
+            return False
+        self._queue.append((dependency, values))
+        if not self._scheduled:
+            self._scheduled = True
+            self.flusher.loop.call_soon_threadsafe(self.drain)
+        return True
+
+    def drain(self):
+        """Apply all the enqueued changes in a single batch. It must be
+        called by the thread running the loop."""
+        self.thread_id = threading.get_ident()
+        # reset the flag before draining, so that a change enqueued after
+        # this point is either drained now or schedules another drain
+        self._scheduled = False
+        queue = self._queue
+        with self.flusher._tracker.batch():
+            while queue:
+                dependency, values = queue.popleft()
+                if values is None:
+                    dependency.changed()
+                else:
+                    dependency.changed(*values)
+
+
 class AsyncioFlushManager(BaseFlushManager):
     """A Flush manager that uses asyncio to schedule the flush operations"""
 
     HAS_SUSPEND_CAPABILITY = True
 
-    def __init__(self, tracker, loop=None):
+    def __init__(self, tracker, loop=None, threadsafe=False,
+                 min_interval=None, max_latency=None, time_budget=None):
+        """
+        :param tracker: the :class:`~.tracker.Tracker` instance
+        :param loop: an optional asyncio loop
+        :param threadsafe: if ``True``, the dependencies can be changed, and
+          so the values can be set, from other threads. Such changes are
+          collected by a :class:`ThreadsafeInbox` and applied on the loop's
+          thread all together, producing a single flush. Computations still
+          have to be created and run on the loop's thread. To use it, pass
+          ``functools.partial(AsyncioFlushManager, threadsafe=True)`` as
+          the flusher factory of the tracker
+        :param min_interval: if given, the flushes are debounced: a flush
+          is run only when no other flush request has arrived for this many
+          seconds, so that bursts of changes are coalesced
+        :param max_latency: the maximum delay in seconds of a debounced flush
+          from the first request it serves, even if the requests keep coming.
+          By default it's equal to `min_interval`. Pending computations with
+          a ``HIGH`` :data:`~.computation.PRIORITY` are not debounced: they
+          are recomputed as soon as possible by a partial flush, while the
+          others keep waiting
+        :param time_budget: if given, the flushes are sliced: each slice
+          recomputes computations until this many seconds are spent, then
+          the rest of the flush is resumed in another loop iteration, so
+          that other tasks can run in between. The `on_after_flush` signal
+          and the `_flush_future` still mark the end of the whole flush
+        """
         super(AsyncioFlushManager, self).__init__(tracker)
         self.loop = loop or asyncio.get_event_loop()
         self._flush_future = None
+        self.inbox = ThreadsafeInbox(self) if threadsafe else None
+        tracker._inbox = self.inbox
+        if max_latency is None:
+            max_latency = min_interval
+        self.min_interval = min_interval
+        self.max_latency = max_latency
+        self.time_budget = time_budget
+        self._timer = None
+        """The handle of the debounced flush, if scheduled"""
+        self._first_request = None
+        self._last_request = None
+        self._urgent = None
+        """The handle of the partial flush of the high priority lane, if
+        scheduled"""
+
+    def add_computation(self, comp):
+        super().add_computation(comp)
+        if self._timer is not None and comp.priority <= PRIORITY.HIGH:
+            self._schedule_urgent()
+
+    def require_flush(self, immediate=False):
+        if self._timer is not None:
+            self._last_request = self.loop.time()
+        super().require_flush(immediate)
+
+    def _on_timer(self):
+        """Run the debounced flush, unless it has to be postponed because
+        of more recent requests."""
+        self._timer = None
+        due = min(self._last_request + self.min_interval,
+                  self._first_request + self.max_latency)
+        if due > self.loop.time():
+            self._timer = self.loop.call_at(due, self._on_timer)
+        else:
+            self._run_flush()
+
+    def _run_urgent(self):
+        self._urgent = None
+        if self._timer is not None and not self._in_flush:
+            BaseFlushManager._run_flush(self, PRIORITY.HIGH)
 
     def _schedule_flush(self):
         self._flush_future = asyncio.Future(loop=self.loop)
-        self.loop.call_soon(self._run_flush)
-        logger.debug("Scheduled asyncio flush")
+        if self.min_interval is None:
+            self.loop.call_soon(self._run_flush)
+            logger.debug("Scheduled asyncio flush")
+        else:
+            now = self.loop.time()
+            self._first_request = self._last_request = now
+            self._timer = self.loop.call_at(now + self.min_interval,
+                                            self._on_timer)
+            first = self._pending.first()
+            if first is not None and first.priority <= PRIORITY.HIGH:
+                self._schedule_urgent()
+            logger.debug("Scheduled debounced asyncio flush")
+
+    def _schedule_urgent(self):
+        if self._urgent is None:
+            self._urgent = self.loop.call_soon(self._run_urgent)
 
     def _run_flush(self):
-        super(AsyncioFlushManager, self)._run_flush()
+        if self.inbox is not None:
+            self.inbox.thread_id = threading.get_ident()
+        deadline = None
+        if self.time_budget is not None:
+            deadline = time.perf_counter() + self.time_budget
+        if not super(AsyncioFlushManager, self)._run_flush(deadline=deadline):
+            self.loop.call_soon(self._run_flush)
+            logger.debug("Asyncio flush slice complete")
+            return
         self._flush_future.set_result(True)
         logger.debug("Asyncio flush complete")
         self._flush_future = None
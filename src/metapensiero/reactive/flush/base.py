@@ -6,8 +6,11 @@
 # :Copyright: Copyright (C) 2016 Alberto Berti
 #
 
+import contextlib
+import heapq
+import itertools
 import logging
-import collections
+import time
 
 from metapensiero import signal
 
@@ -17,6 +20,77 @@ from ..computation import Computation
 logger = logging.getLogger(__name__)
 
 
+class PendingQueue:
+    """The collection of the computations waiting to be recomputed. It's a
+    heap indexed by computation, so that membership tests and removals are
+    O(1) and insertions and extractions are O(log n).
+
+    Computations are extracted ordered by their *priority* lane first, then
+    by their height in the dependency graph and lastly by insertion order.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._index = {}
+        self._sequence = itertools.count()
+        """Tie breaker for computations with the same priority and height,
+        keeps them in insertion order"""
+
+    def __contains__(self, comp):
+        return comp in self._index
+
+    def __iter__(self):
+        """Iterate over the pending computations in extraction order,
+        without removing them."""
+        return (entry[-1] for entry in sorted(self._index.values()))
+
+    def __len__(self):
+        return len(self._index)
+
+    def discard(self, comp):
+        """Remove a computation if present. The entry is just marked as
+        removed and skipped later by :meth:`pop`."""
+        entry = self._index.pop(comp, None)
+        if entry is not None:
+            entry[-1] = None
+
+    def first(self):
+        """Return the next computation to recompute without removing it, or
+        ``None`` if the queue is empty."""
+        heap = self._heap
+        while heap:
+            comp = heap[0][-1]
+            if comp is not None:
+                return comp
+            heapq.heappop(heap)
+        return None
+
+    def pop(self):
+        """Remove and return the next computation to recompute."""
+        heap = self._heap
+        while heap:
+            comp = heapq.heappop(heap)[-1]
+            if comp is not None:
+                del self._index[comp]
+                return comp
+        raise KeyError('pop from an empty queue')
+
+    def update(self, comp):
+        """Move a computation to its new position after its priority or its
+        height have changed, if present."""
+        entry = self._index.get(comp)
+        if entry is not None and entry[:2] != [comp.priority, comp._height]:
+            self.discard(comp)
+            self.push(comp)
+
+    def push(self, comp):
+        """Add a computation, if it isn't already present."""
+        if comp not in self._index:
+            entry = [comp.priority, comp._height, next(self._sequence), comp]
+            self._index[comp] = entry
+            heapq.heappush(self._heap, entry)
+
+
 class BaseFlushManager(metaclass=signal.SignalAndHandlerInitMeta):
     "Base flush manager."
 
@@ -39,20 +113,64 @@ class BaseFlushManager(metaclass=signal.SignalAndHandlerInitMeta):
         self._tracker = tracker
         self._in_flush = False
         "Marker that is True when a flush is in progress"
-        self._pending = collections.deque()
+        self._pending = PendingQueue()
         """Contains the invalidated computations that will be recomputed in
         the next scheduled flush"""
         self._will_flush = False
         """Marker that is True when a flush operation is scheduled"""
         self._flush_requested = False
+        self._epoch = 0
+        """Counter of the completed flush cycles, the partial flushes of a
+        lane and the slices of a flush don't count"""
+        self._touched = []
+        """The dependencies that have recorded their value at the start of
+        the current flush cycle, see
+        :meth:`~.dependency.Dependency.value_changed`"""
+        self._held = 0
+        """Counter of the active :meth:`hold` blocks"""
+        self._held_request = None
+        """The flush request received while held, if any. It's ``True`` if
+        an immediate flush was requested"""
+        self._interrupted = False
+        """Marker that is True when the last flush has been interrupted by
+        its deadline, so that the flush cycle isn't complete"""
+        self._recalcs = None
+        """The computations requeued during the current flush cycle, shared
+        by its slices"""
 
     def add_computation(self, comp):
         assert (isinstance(comp, Computation) and
                 comp._tracker is self._tracker)
-        if comp not in self._pending:
-            self._pending.append(comp)
+        self._pending.push(comp)
+
+    def update_computation(self, comp):
+        """Update the position of a pending computation after its priority
+        or its height have changed."""
+        self._pending.update(comp)
+
+    def remove_computation(self, comp):
+        """Remove a computation from the pending ones, if present."""
+        self._pending.discard(comp)
+
+    @contextlib.contextmanager
+    def hold(self):
+        """Context manager that defers any flush request made inside its
+        block to the end of it, so that many changes produce a single
+        flush."""
+        self._held += 1
+        try:
+            yield
+        finally:
+            self._held -= 1
+            if self._held == 0 and self._held_request is not None:
+                immediate = self._held_request
+                self._held_request = None
+                self.require_flush(immediate)
 
     def require_flush(self, immediate=False):
+        if self._held:
+            self._held_request = bool(self._held_request or immediate)
+            return
         if not self._will_flush:
             self._will_flush = True
             if immediate:
@@ -81,23 +199,58 @@ class BaseFlushManager(metaclass=signal.SignalAndHandlerInitMeta):
                 self._run_flush()
                 self._flush_requested = False
 
-    def _run_flush(self):
+    def _end_cycle(self):
+        """Mark the end of a flush cycle, resetting the values recorded by
+        the dependencies changed during it."""
+        self._epoch += 1
+        touched, self._touched = self._touched, []
+        for dep in touched:
+            dep._base = None
+
+    def _run_flush(self, lane=None, deadline=None):
+        """Recompute the pending computations.
+
+        :param lane: if given, only the computations with this
+          :data:`~.computation.PRIORITY` or a higher one are recomputed, the
+          others are left pending for a later flush
+        :param deadline: if given, a `time.perf_counter` value after which
+          the flush is interrupted, leaving the remaining computations
+          pending. The flush cycle is completed by the following calls, and
+          only then the `on_after_flush` signal is notified
+        :returns: ``True`` if the flush cycle has been completed
+        """
         if self._in_flush:
             raise ReactiveError('A flush is in progress already')
         if self._tracker.in_compute:
             raise ReactiveError('Running a flush operation while a '
                                 'calculation is in progress is forbidden')
         logger.debug('Flush operation starts')
+        if self._tracker._orphaned:
+            self._tracker._stop_orphaned()
         pending = self._pending
+        stats = self._tracker.stats
+        profiler = self._tracker._profiler
+        if stats is not None:
+            stats.flushes += 1
+        if stats is not None or profiler is not None:
+            started = time.perf_counter()
         self._in_flush = True
-        recalcs = set()
+        if lane is None:
+            if not self._interrupted:
+                self._recalcs = set()
+            recalcs = self._recalcs
+        else:
+            recalcs = set()
+        interrupted = False
         try:
-            if len(pending) > 0:
+            if lane is None and not self._interrupted and len(pending) > 0:
                 # pending may not contain all the computation flushed
-                self.on_before_flush.notify(pending)
+                self.on_before_flush.notify(list(pending))
                 self.on_before_flush.clear()
             while len(pending) > 0:
-                comp = pending.popleft()
+                if lane is not None and pending.first().priority > lane:
+                    break
+                comp = pending.pop()
                 comp._recompute()
                 if comp._needs_recompute:
                     if comp in recalcs:
@@ -109,12 +262,33 @@ class BaseFlushManager(metaclass=signal.SignalAndHandlerInitMeta):
                         # valid state
                         recalcs.add(comp)
                         logger.warning('A computation needs still a recalculation')
-                        pending.append(comp)
-            self.on_after_flush.notify()
-            self.on_after_flush.clear()
+                        if stats is not None:
+                            stats.requeued += 1
+                        if profiler is not None:
+                            profiler.requeued(comp)
+                        pending.push(comp)
+                if (deadline is not None and len(pending) > 0 and
+                        time.perf_counter() >= deadline):
+                    interrupted = True
+                    break
+            if lane is None and not interrupted:
+                self.on_after_flush.notify()
+                self.on_after_flush.clear()
         finally:
             self._in_flush = False
-            self._will_flush = False
+            if lane is None:
+                self._interrupted = interrupted
+                if not interrupted:
+                    self._will_flush = False
+                    self._recalcs = None
+                    self._end_cycle()
+            if stats is not None or profiler is not None:
+                elapsed = time.perf_counter() - started
+                if stats is not None:
+                    stats.flush_duration.observe(elapsed)
+                if profiler is not None:
+                    profiler.flushed(elapsed)
+        return not interrupted
 
 
-__all__ = ('BaseFlushManager', )
+__all__ = ('BaseFlushManager', 'PendingQueue')
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+# :Project: metapensiero.reactive -- dependency graph snapshot
+# :Created: ven 16 ott 2026 20:57:29 CEST
+# :Author:  agent <agent@local>
+# :License: GNU General Public License version 3 or later
+#
+
+import collections
+import functools
+import json
+import logging
+
+from .dependency import EventDependency, FollowMixin
+
+logger = logging.getLogger(__name__)
+
+
+EDGE_DEPENDS = 'depends'
+"""Kind of the edges going from a dependency to a computation depending on
+it."""
+
+EDGE_PARENT = 'parent'
+"""Kind of the edges going from a computation to its children."""
+
+EDGE_FOLLOWS = 'follows'
+"""Kind of the edges going from a dependency to another one that follows
+its changes."""
+
+
+def _followers(dependency):
+    """Find the dependencies following the given one, looking at the
+    subscribers of its change signal."""
+    if not isinstance(dependency, EventDependency):
+        return
+    for handler in dependency.on_change.subscribers:
+        if isinstance(handler, functools.partial):
+            follower = getattr(handler.func, '__self__', None)
+            if isinstance(follower, FollowMixin):
+                yield follower
+
+
+def collect(tracker):
+    """Collect the live objects of the graph of a tracker: all the active
+    computations, the dependencies they depend on and the dependencies
+    linked to those by :meth:`~.dependency.FollowMixin.follow`, in both
+    directions.
+
+    :returns: a tuple ``(computations, dependencies)`` of lists
+    """
+    computations = [c for c in list(tracker._computations) if not c.stopped]
+    dependencies = []
+    seen = set()
+    pending = []
+    for comp in computations:
+        for dep in comp._dependencies:
+            if id(dep) not in seen:
+                seen.add(id(dep))
+                pending.append(dep)
+    while pending:
+        dep = pending.pop()
+        dependencies.append(dep)
+        linked = list(_followers(dep))
+        if isinstance(dep, FollowMixin):
+            linked.extend(dep._following.keys())
+        for other in linked:
+            if id(other) not in seen:
+                seen.add(id(other))
+                pending.append(other)
+    return computations, dependencies
+
+
+def _distribution(degrees):
+    return dict(sorted(collections.Counter(degrees).items()))
+
+
+class GraphSnapshot:
+    """A snapshot of the live dependency graph of a tracker, see
+    :meth:`~.tracker.Tracker.graph_snapshot`.
+
+    The graph is composed by all the active computations, the dependencies
+    they depend on and the dependencies linked to those by
+    :meth:`~.dependency.FollowMixin.follow`. Each node is a dictionary
+    with an ``id``, a ``type``, a ``label`` and the ``height`` of the node in
+    the graph. Each edge is a tuple ``(source id, target id, kind)``.
+
+    :param tracker: the :class:`~.tracker.Tracker` instance
+    """
+
+    def __init__(self, tracker):
+        self.nodes = {}
+        """The nodes of the graph, by id"""
+        self.edges = []
+        """The edges of the graph"""
+        self._ids = {}
+        self._walk(tracker)
+
+    def _node_id(self, obj, prefix):
+        key = id(obj)
+        node_id = self._ids.get(key)
+        if node_id is None:
+            node_id = self._ids[key] = '{}{}'.format(prefix, len(self._ids))
+        return node_id
+
+    def _add_computation(self, comp):
+        node_id = self._node_id(comp, 'c')
+        if node_id not in self.nodes:
+            self.nodes[node_id] = dict(
+                id=node_id, type=type(comp).__qualname__, label=comp.name,
+                height=comp._height, kind='computation',
+                invalidated=comp.invalidated, priority=comp.priority.name)
+        return node_id
+
+    def _add_dependency(self, dep):
+        node_id = self._node_id(dep, 'd')
+        if node_id not in self.nodes:
+            self.nodes[node_id] = dict(
+                id=node_id, type=type(dep).__qualname__, label=dep.name,
+                height=dep._height, kind='dependency')
+        return node_id
+
+    def _walk(self, tracker):
+        computations, dependencies = collect(tracker)
+        for comp in computations:
+            comp_id = self._add_computation(comp)
+            parent = comp._parent
+            if parent is not None and not parent.stopped:
+                self.edges.append((self._add_computation(parent), comp_id,
+                                   EDGE_PARENT))
+            for dep in comp._dependencies:
+                self.edges.append((self._add_dependency(dep), comp_id,
+                                   EDGE_DEPENDS))
+        for dep in dependencies:
+            dep_id = self._add_dependency(dep)
+            if isinstance(dep, FollowMixin):
+                for followed in list(dep._following.keys()):
+                    self.edges.append((self._add_dependency(followed), dep_id,
+                                       EDGE_FOLLOWS))
+
+    def stats(self, top=10):
+        """Return the aggregate statistics of the graph: the number of nodes
+        by type, the number of edges by kind, the maximum depth and the
+        distributions of the fan-in and fan-out of the nodes, mapping each
+        degree to the number of nodes having it. It also lists the nodes
+        with the highest fan-out, which are the first suspects of quadratic
+        subscription patterns.
+
+        :param top: the number of nodes with the highest fan-out to list
+        """
+        fan_in = collections.Counter()
+        fan_out = collections.Counter()
+        for source, target, kind in self.edges:
+            fan_out[source] += 1
+            fan_in[target] += 1
+        nodes = self.nodes.values()
+        return dict(
+            nodes=len(self.nodes),
+            edges=len(self.edges),
+            nodes_by_type=dict(collections.Counter(n['type'] for n in nodes)),
+            edges_by_kind=dict(collections.Counter(e[2] for e in self.edges)),
+            max_depth=max((n['height'] for n in nodes), default=0),
+            fan_in=_distribution(fan_in[n] for n in self.nodes),
+            fan_out=_distribution(fan_out[n] for n in self.nodes),
+            top_fan_out=[dict(id=node_id, label=self.nodes[node_id]['label'],
+                              fan_out=count)
+                         for node_id, count in fan_out.most_common(top)],
+        )
+
+    def as_dict(self):
+        """Return the whole snapshot as a plain dictionary."""
+        return dict(nodes=list(self.nodes.values()),
+                    edges=[dict(source=s, target=t, kind=k)
+                           for s, t, k in self.edges],
+                    stats=self.stats())
+
+    def to_json(self, **kwargs):
+        """Return the snapshot as a JSON document.
+
+        :param \\*\\*kwargs: passed to `json.dumps`
+        """
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def to_dot(self, name='reactive'):
+        """Return the snapshot in the Graphviz DOT format. Computations are
+        drawn as boxes and dependencies as ellipses, the edges between
+        parent and child computations are dashed and those between followed
+        and following dependencies are dotted.
+
+        :param name: the name of the graph
+        """
+        def quote(text):
+            return '"{}"'.format(str(text).replace('\\', '\\\\')
+                                 .replace('"', '\\"'))
+
+        lines = ['digraph {} {{'.format(quote(name)), '  rankdir=LR;']
+        for node_id, node in self.nodes.items():
+            shape = 'box' if node['kind'] == 'computation' else 'ellipse'
+            lines.append('  {} [label={}, shape={}];'.format(
+                node_id, quote(node['label']), shape))
+        styles = {EDGE_DEPENDS: '', EDGE_PARENT: ' [style=dashed]',
+                  EDGE_FOLLOWS: ' [style=dotted]'}
+        for source, target, kind in self.edges:
+            lines.append('  {} -> {}{};'.format(source, target, styles[kind]))
+        lines.append('}')
+        return '\n'.join(lines) + '\n'
+
+
+__all__ = ('GraphSnapshot', 'collect', 'EDGE_DEPENDS', 'EDGE_PARENT',
+           'EDGE_FOLLOWS')
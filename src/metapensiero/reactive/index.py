@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# :Project: metapensiero.reactive -- secondary indexes on reactive dicts
+# :Created: ven 16 ott 2026 21:12:10 CEST
+# :Author:  agent <agent@local>
+# :License: GNU General Public License version 3 or later
+#
+
+import logging
+import operator
+
+from .base import Tracked
+from .dependency import Dependency
+from .dict import missing
+from .views import SourceFollower
+
+logger = logging.getLogger(__name__)
+
+
+class Index(SourceFollower, Tracked):
+    """A secondary index on the values of a :class:`~.dict.ReactiveDict`,
+    see :meth:`~.dict.ReactiveDict.create_index`.
+
+    It maps the result of `keyfunc` called on each value, the *bucket*, to
+    the keys having such values and it's maintained incrementally from the
+    change events of the dict, see :class:`~.views.DictView` for their
+    limits. Each bucket has its own dependency, so a computation reading a
+    bucket is invalidated only when a key enters or leaves it, not when the
+    values of its keys change or when other buckets change.
+
+    :param source: the :class:`~.dict.ReactiveDict` instance
+    :param name: the name of the index
+    :param keyfunc: a function taking a value and returning its bucket, by
+      default it reads the attribute with the same name of the index
+    """
+
+    def __init__(self, source, name, keyfunc=None, *, tracker=None):
+        if tracker is None:
+            tracker = source._tracker
+        super().__init__(tracker=tracker)
+        self.name = name
+        self._keyfunc = keyfunc or operator.attrgetter(name)
+        self._buckets = {}
+        """The keys of the source, by bucket"""
+        self._bucket_of = {}
+        """The bucket of each key of the source"""
+        self._dependencies = {}
+        """The dependencies of the buckets read by the computations"""
+        self._buckets_dep = Dependency(self, tracker=tracker,
+                                       label='Index({!r})'.format(name))
+        """The dependency tracking the addition or removal of buckets"""
+        self._follow_source(source)
+
+    def __contains__(self, bucket):
+        if self.tracker.active:
+            self._bucket_dependency(bucket).depend()
+        return bucket in self._buckets
+
+    def __getitem__(self, bucket):
+        """Return the keys in the given bucket as a `frozenset`, which is
+        empty for a bucket that has no key. The current computation is
+        invalidated when the keys in the bucket change."""
+        if self.tracker.active:
+            self._bucket_dependency(bucket).depend()
+        keys = self._buckets.get(bucket)
+        return frozenset() if keys is None else frozenset(keys)
+
+    def _bucket_changed(self, bucket):
+        dep = self._dependencies.get(bucket)
+        if dep is not None:
+            if not (dep.has_dependents or bucket in self._buckets):
+                del self._dependencies[bucket]
+            dep.changed()
+
+    def _bucket_dependency(self, bucket):
+        """Return the dependency of the given bucket, creating it if it
+        doesn't exist yet."""
+        dep = self._dependencies.get(bucket)
+        if dep is None:
+            dep = self._dependencies[bucket] = Dependency(
+                self, tracker=self._tracker,
+                label='Index({!r})[{!r}]'.format(self.name, bucket))
+        return dep
+
+    def _remove_key(self, bucket, key):
+        keys = self._buckets[bucket]
+        keys.discard(key)
+        if not keys:
+            del self._buckets[bucket]
+            self._buckets_dep.changed()
+        self._bucket_changed(bucket)
+
+    def _source_del(self, key):
+        bucket = self._bucket_of.pop(key, missing)
+        if bucket is not missing:
+            self._remove_key(bucket, key)
+
+    def _source_set(self, key, value):
+        bucket = self._keyfunc(value)
+        old_bucket = self._bucket_of.get(key, missing)
+        if old_bucket is not missing:
+            if old_bucket == bucket:
+                return
+            self._remove_key(old_bucket, key)
+        self._bucket_of[key] = bucket
+        keys = self._buckets.get(bucket)
+        if keys is None:
+            keys = self._buckets[bucket] = set()
+            self._buckets_dep.changed()
+        keys.add(key)
+        self._bucket_changed(bucket)
+
+    def buckets(self):
+        """Return the buckets that have at least a key. The current
+        computation is invalidated when a bucket is added or removed."""
+        self._buckets_dep.depend()
+        return list(self._buckets)
+
+    def count(self, bucket):
+        """Return the number of keys in the given bucket."""
+        if self.tracker.active:
+            self._bucket_dependency(bucket).depend()
+        keys = self._buckets.get(bucket)
+        return 0 if keys is None else len(keys)
+
+
+__all__ = ('Index',)
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+# :Project: metapensiero.reactive -- lazy memoized values
+# :Created: ven 16 ott 2026 20:50:35 CEST
+# :Author:  agent <agent@local>
+# :License: GNU General Public License version 3 or later
+#
+
+import functools
+import logging
+import operator
+import weakref
+
+from . import undefined
+from .base import Tracked, qualified_name, weak_partial
+from .dependency import Dependency
+
+logger = logging.getLogger(__name__)
+
+
+class Memo(Tracked):
+    """A lazily computed, memoized value.
+
+    The function is run only when the value is read and its result is kept
+    until any of the dependencies it collected changes. At that point the
+    memo is just marked as *stale*: if no computation depends on it, the
+    function will be run again only on the next read, otherwise it's run
+    by the flusher before its dependents. In both cases, when the new result
+    is equal to the previous one according to the `equal` function, the
+    dependents of the memo are not invalidated.
+
+    It works as a single value container, reading its ``value`` member or
+    calling the instance, and as a method decorator, where it behaves like a
+    read-only property with a separate memoized value per instance.
+    See also :func:`computed`.
+
+    :param func: the function that calculates the value
+    :param equal: an optional equality comparison function to be used
+      instead of the default ``operator.eq``
+    :param owner: an optional object that owns this memo. When it's garbage
+      collected the tracking of the dependencies is stopped
+    """
+
+    def __init__(self, func, equal=None, *, tracker=None, owner=None):
+        super().__init__(tracker=tracker)
+        self._func = func
+        self._equal = equal or operator.eq
+        self._value = undefined
+        self._dep = Dependency(self, tracker=tracker,
+                               label=qualified_name(func))
+        self._comp = None
+        self._instances = None
+        self._owner = None if owner is None else weakref.ref(owner)
+        functools.update_wrapper(self, func)
+
+    def __call__(self):
+        return self.value
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return self._instance_memo(instance).value
+
+    def __set__(self, instance, value):
+        raise AttributeError("Cannot set the value of a Memo")
+
+    def __delete__(self, instance):
+        if self._instances is not None:
+            memo = self._instances.pop(instance, None)
+            if memo is not None:
+                memo.stop()
+
+    def _guard(self, comp):
+        """Computation guard that allows the flusher to recompute the value
+        only if there is someone depending on it. Otherwise the memo stays
+        stale until the next read."""
+        return self._dep.has_dependents
+
+    def _instance_memo(self, instance):
+        if self._instances is None:
+            self._instances = weakref.WeakKeyDictionary()
+        memo = self._instances.get(instance)
+        if memo is None:
+            # do not keep the instance alive
+            memo = type(self)(weak_partial(self._func, instance), self._equal,
+                              tracker=self._tracker, owner=instance)
+            self._instances[instance] = memo
+        return memo
+
+    def _refresh(self):
+        comp = self._comp
+        if comp is None:
+            owner = None if self._owner is None else self._owner()
+            comp = self.tracker.reactive(self._run, with_parent=False,
+                                         owner=owner,
+                                         label=qualified_name(self._func))
+            comp.guard = self._guard
+            self._comp = comp
+        else:
+            comp._recompute()
+
+    def _run(self, comp):
+        new = self._func()
+        old = self._value
+        self._value = new
+        if not ((old is undefined) or self._equal(old, new)):
+            self._dep.value_changed(old, new, self._equal)
+
+    @property
+    def stale(self):
+        """``True`` if the value has to be calculated again before being
+        read."""
+        return self._comp is None or self._comp.invalidated
+
+    @property
+    def value(self):
+        if self.stale:
+            self._refresh()
+        if self.tracker.active:
+            self._dep._produced_by(self._comp)
+            self._dep.depend()
+        return self._value
+
+    def invalidate(self):
+        """Mark the value as stale."""
+        if self._comp is not None:
+            self._comp.invalidate()
+
+    def stop(self):
+        """Stop tracking the dependencies and forget the value. It will be
+        calculated again on the next read."""
+        comp = self._comp
+        if comp is not None:
+            self._comp = None
+            comp.stop()
+        self._value = undefined
+
+
+def computed(func=None, *, equal=None, tracker=None):
+    """Decorator that wraps a function or a method in a :class:`Memo`. It can
+    be used with or without arguments:
+
+    .. code:: python
+
+      class Cart:
+
+          @computed
+          def total(self):
+              return sum(item.price for item in self.items)
+
+          @computed(equal=math.isclose)
+          def average(self):
+              return self.total / len(self.items)
+    """
+    def decorate(func):
+        return Memo(func, equal, tracker=tracker)
+
+    if func is None:
+        return decorate
+    else:
+        return decorate(func)
+
+
+__all__ = ('Memo', 'computed')
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+# :Project: metapensiero.reactive -- memory accounting
+# :Created: ven 16 ott 2026 21:00:36 CEST
+# :Author:  agent <agent@local>
+# :License: GNU General Public License version 3 or later
+#
+
+import collections
+import logging
+import os
+import sys
+import tracemalloc
+
+from metapensiero import signal
+
+from .dependency import FollowMixin, StreamDependency
+from .graph import collect
+from .stream_utils import Selector, Tee
+from .value import Value
+
+logger = logging.getLogger(__name__)
+
+
+KIND_COMPUTATIONS = 'computations'
+KIND_DEPENDENCIES = 'dependencies'
+KIND_SUBSCRIBERS = 'signal subscribers'
+KIND_FOLLOWING = 'following maps'
+KIND_VALUES = 'value descriptors'
+KIND_STREAMS = 'stream queues'
+
+KINDS = (KIND_COMPUTATIONS, KIND_DEPENDENCIES, KIND_SUBSCRIBERS,
+         KIND_FOLLOWING, KIND_VALUES, KIND_STREAMS)
+"""The kinds of objects accounted by :class:`MemoryReport`, in order."""
+
+_signal_names = {}
+
+
+def _signals(cls):
+    """Return the names of the signals defined by a class."""
+    names = _signal_names.get(cls)
+    if names is None:
+        names = _signal_names[cls] = tuple(
+            name for name in dir(cls)
+            if isinstance(getattr(cls, name, None), signal.Signal))
+    return names
+
+
+class MemoryReport:
+    """The retained size of the bookkeeping of a reactive graph, see
+    :meth:`~.tracker.Tracker.memory_report`.
+
+    The sizes are measured with `sys.getsizeof`, so they are shallow: they
+    include the objects and the containers used by the package, but not the
+    values stored in them nor the handlers connected to the signals. Each
+    object is accounted only once.
+
+    If `tracemalloc` is tracing when the report is created, the memory it
+    traced is also reported split between the modules of this package and
+    the rest of the process.
+    """
+
+    def __init__(self):
+        self.kinds = collections.OrderedDict(
+            (kind, dict(count=0, size=0)) for kind in KINDS)
+        """The number of the objects and their size in bytes, by kind"""
+        self.traced = None
+        """The memory traced by `tracemalloc` that has been allocated by the
+        modules of this package, by module file name, if tracing"""
+        self.traced_total = None
+        """The total memory traced by `tracemalloc`, if tracing"""
+        self._seen = set()
+
+    @property
+    def total(self):
+        """The total size in bytes of the accounted objects."""
+        return sum(k['size'] for k in self.kinds.values())
+
+    def add(self, kind, *objects, count=1):
+        """Account the given objects, that belong to a single logical entity,
+        under the given kind.
+
+        :param count: the number of entities to add to the count of the kind
+        """
+        size = 0
+        for obj in objects:
+            if obj is not None and id(obj) not in self._seen:
+                self._seen.add(id(obj))
+                size += sys.getsizeof(obj)
+        entry = self.kinds[kind]
+        entry['count'] += count
+        entry['size'] += size
+
+    def as_dict(self):
+        result = dict(kinds={k: dict(v) for k, v in self.kinds.items()},
+                      total=self.total)
+        if self.traced is not None:
+            result['traced'] = dict(self.traced)
+            result['traced_total'] = self.traced_total
+        return result
+
+    def format(self):
+        """Return the report as a text table."""
+        lines = ['{:<20} {:>10} {:>14}'.format('kind', 'count', 'bytes')]
+        for kind, entry in self.kinds.items():
+            lines.append('{:<20} {:>10} {:>14}'.format(kind, entry['count'],
+                                                       entry['size']))
+        lines.append('{:<20} {:>10} {:>14}'.format('total', '', self.total))
+        if self.traced is not None:
+            lines.append('traced by tracemalloc: {} bytes of {} in '
+                         'this package'.format(sum(self.traced.values()),
+                                               self.traced_total))
+        return '\n'.join(lines)
+
+    def _account_computation(self, comp):
+        self.add(KIND_COMPUTATIONS, comp, comp._dependencies)
+        self._account_signals(comp)
+
+    def _account_dependency(self, dep):
+        self.add(KIND_DEPENDENCIES, dep, dep._dependents,
+                 getattr(dep, '__dict__', None))
+        if isinstance(dep, FollowMixin):
+            following = dep._following
+            self.add(KIND_FOLLOWING, following, following.data,
+                     *following.data.keys(), *following.data.values())
+        if isinstance(dep, StreamDependency):
+            self._account_stream(dep._internal_tee)
+            self._account_stream(dep._follow_selector)
+            self._account_stream(dep._public_tee)
+        self._account_signals(dep)
+
+    def _account_signals(self, obj):
+        for name in _signals(type(obj)):
+            subscribers = getattr(obj, name).subscribers
+            self.add(KIND_SUBSCRIBERS, subscribers, count=0)
+            self.kinds[KIND_SUBSCRIBERS]['count'] += len(subscribers)
+
+    def _account_stream(self, stream):
+        if id(stream) in self._seen:
+            return
+        if isinstance(stream, Tee):
+            queues = stream._queues
+            self.add(KIND_STREAMS, stream, queues, stream._send_queue,
+                     *queues.values())
+        elif isinstance(stream, Selector):
+            data = stream._source_data
+            self.add(KIND_STREAMS, stream, stream._results, stream._sources,
+                     data, *data.values())
+
+    def _account_value(self, value):
+        if id(value) in self._seen:
+            return
+        if value._descriptor_initialized:
+            # one entry per instance, keyed by weak references
+            objects = [value]
+            for member in (value._dep, value._value, value._comp):
+                objects.extend((member, member.data))
+                objects.extend(member.data.keys())
+            self.add(KIND_VALUES, *objects)
+        else:
+            self.add(KIND_VALUES, value)
+
+    def _account_tracemalloc(self):
+        if not tracemalloc.is_tracing():
+            return
+        package_dir = os.path.dirname(os.path.abspath(__file__))
+        self.traced = {}
+        self.traced_total = 0
+        snapshot = tracemalloc.take_snapshot()
+        for stat in snapshot.statistics('filename'):
+            self.traced_total += stat.size
+            filename = stat.traceback[0].filename
+            if filename.startswith(package_dir):
+                name = os.path.relpath(filename, package_dir)
+                self.traced[name] = stat.size
+
+
+def memory_report(tracker, *objects):
+    """Measure the memory retained by the graph of a tracker.
+
+    :param tracker: the :class:`~.tracker.Tracker` instance
+    :param \\*objects: other objects to account, like :class:`~.value.Value`,
+      :class:`~.stream_utils.Tee` or :class:`~.stream_utils.Selector`
+      instances that are not reachable from the graph
+    :returns: a :class:`MemoryReport` instance
+    """
+    report = MemoryReport()
+    computations, dependencies = collect(tracker)
+    for comp in computations:
+        report._account_computation(comp)
+    values = {}
+    for dep in dependencies:
+        report._account_dependency(dep)
+        if isinstance(dep.source, Value):
+            values[id(dep.source)] = dep.source
+    for obj in list(values.values()) + list(objects):
+        if isinstance(obj, Value):
+            report._account_value(obj)
+        elif isinstance(obj, (Tee, Selector)):
+            report._account_stream(obj)
+        else:
+            raise TypeError("Cannot account {!r}".format(obj))
+    report._account_tracemalloc()
+    return report
+
+
+__all__ = ('KINDS', 'MemoryReport', 'memory_report')
@@ -26,7 +26,8 @@ class ReactiveNamedListMixin:
             tracker = get_tracker()
             deps = super().__getattribute__('_deps')
             if name not in deps:
-                deps[name] = tracker.dependency()
+                deps[name] = tracker.dependency(label='{}.{}'.format(
+                    type(self).__qualname__, name))
             deps[name].depend()
         return super().__getattribute__(name)
 
@@ -42,7 +43,7 @@ class ReactiveNamedListMixin:
             if name in deps:
                 eq = super().__getattribute__('_field_eq')
                 if old is undefined or not eq(old, new):
-                    deps[name].changed()
+                    deps[name].value_changed(old, new, eq)
         else:
             res = super().__setattr__(name, new)
         return res
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+# :Project: metapensiero.reactive -- computations profiler
+# :Created: ven 16 ott 2026 20:55:56 CEST
+# :Author:  agent <agent@local>
+# :License: GNU General Public License version 3 or later
+#
+
+import collections
+import logging
+
+from .exception import ReactiveError
+
+logger = logging.getLogger(__name__)
+
+
+class ComputationProfile:
+    """The profile of the computations sharing the same name, see
+    :attr:`~.computation.BaseComputation.name`."""
+
+    __slots__ = ('name', 'calls', 'total_time', 'max_time', 'requeued',
+                 'triggers')
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        """Number of runs"""
+        self.total_time = 0.0
+        """Total wall time of the runs, in seconds. It includes the time
+        spent by nested computations"""
+        self.max_time = 0.0
+        """Wall time of the slowest run, in seconds"""
+        self.requeued = 0
+        """Number of times the flusher found the computation still
+        invalidated after its recomputation"""
+        self.triggers = collections.Counter()
+        """Number of invalidations by name of the dependency that caused
+        them, see :attr:`~.dependency.Dependency.name`"""
+
+    def __repr__(self):
+        return ('<{} {!r} calls={} total_time={:.6f} requeued={}>'
+                .format(type(self).__name__, self.name, self.calls,
+                        self.total_time, self.requeued))
+
+    @property
+    def mean_time(self):
+        return self.total_time / self.calls if self.calls else 0.0
+
+    def as_dict(self):
+        return dict(name=self.name, calls=self.calls,
+                    total_time=self.total_time, mean_time=self.mean_time,
+                    max_time=self.max_time, requeued=self.requeued,
+                    triggers=dict(self.triggers))
+
+
+class Profiler:
+    """Collects the profile of the computations of a tracker while it's
+    active. It's a context manager, returned by
+    :meth:`~.tracker.Tracker.profile`, and only one can be active at a time
+    on a tracker.
+
+    :param tracker: the :class:`~.tracker.Tracker` instance
+    """
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+        self.profiles = {}
+        """The :class:`ComputationProfile` instances, by name"""
+        self.flushes = 0
+        """Number of the flush operations"""
+        self.flush_time = 0.0
+        """Total wall time of the flush operations, in seconds"""
+
+    def __enter__(self):
+        if self.tracker._profiler is not None:
+            raise ReactiveError("A profiler is active already")
+        self.tracker._profiler = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.tracker._profiler is self:
+            self.tracker._profiler = None
+        return False
+
+    def _profile(self, computation):
+        name = computation.name
+        profile = self.profiles.get(name)
+        if profile is None:
+            profile = self.profiles[name] = ComputationProfile(name)
+        return profile
+
+    def computed(self, computation, elapsed):
+        """Record a run of a computation."""
+        profile = self._profile(computation)
+        profile.calls += 1
+        profile.total_time += elapsed
+        if elapsed > profile.max_time:
+            profile.max_time = elapsed
+
+    def flushed(self, elapsed):
+        """Record a flush operation."""
+        self.flushes += 1
+        self.flush_time += elapsed
+
+    def invalidated(self, computation, dependency):
+        """Record the invalidation of a computation by a dependency, which
+        is ``None`` when invalidated explicitly."""
+        name = '<explicit>' if dependency is None else dependency.name
+        self._profile(computation).triggers[name] += 1
+
+    def requeued(self, computation):
+        """Record that a computation has been recomputed again because still
+        invalidated."""
+        self._profile(computation).requeued += 1
+
+    def report(self, key='total_time', limit=None):
+        """Return the profiles of the computations, the hottest first.
+
+        :param key: the name of the :class:`ComputationProfile` member used to
+          sort them
+        :param limit: an optional maximum number of profiles to return
+        :returns: a list of :class:`ComputationProfile` instances
+        """
+        result = sorted(self.profiles.values(),
+                        key=lambda p: getattr(p, key), reverse=True)
+        if limit is not None:
+            result = result[:limit]
+        return result
+
+    def format_report(self, key='total_time', limit=20):
+        """Return the report as a text table, see :meth:`report`."""
+        lines = ['{:>8} {:>10} {:>10} {:>10} {:>8}  {}'.format(
+            'calls', 'total ms', 'mean ms', 'max ms', 'requeued', 'name')]
+        row = '{:>8} {:>10.3f} {:>10.3f} {:>10.3f} {:>8}  {}'
+        for p in self.report(key, limit):
+            lines.append(row.format(
+                p.calls, p.total_time * 1000, p.mean_time * 1000,
+                p.max_time * 1000, p.requeued, p.name))
+            if p.triggers:
+                trigger, count = p.triggers.most_common(1)[0]
+                lines.append('{:>51}  triggered by {} ({} times)'.format(
+                    '', trigger, count))
+        lines.append('{} flushes in {:.3f} ms'.format(self.flushes,
+                                                     self.flush_time * 1000))
+        return '\n'.join(lines)
+
+
+__all__ = ('ComputationProfile', 'Profiler')
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# :Project: metapensiero.reactive -- tracker statistics
+# :Created: ven 16 ott 2026 20:54:34 CEST
+# :Author:  agent <agent@local>
+# :License: GNU General Public License version 3 or later
+#
+
+import bisect
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+DURATION_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+"""Default bounds, in seconds, of the flush duration histogram."""
+
+FANOUT_BUCKETS = (1, 2, 5, 10, 50, 100, 500, 1000, 5000)
+"""Default bounds of the histogram of the number of dependents notified by
+each change."""
+
+
+class Histogram:
+    """A simple histogram with fixed bucket bounds.
+
+    :param buckets: the upper bounds of the buckets, an implicit last
+      bucket collects all the observations greater than the last bound
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def as_dict(self):
+        """Return the cumulative counts of the buckets, keyed by their upper
+        bound, together with the count and the sum of the observations."""
+        buckets = {}
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            buckets[str(bound)] = total
+        return dict(buckets=buckets, count=self.count, sum=self.sum)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def reset(self):
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0
+
+
+class TrackerStats:
+    """The counters and histograms collected by a tracker when its stats are
+    enabled, see :meth:`~.tracker.Tracker.enable_stats`."""
+
+    COUNTERS = (
+        ('depends', "Number of the dependencies declared by the computations"),
+        ('changes', "Number of the changes of the dependencies"),
+        ('invalidations', "Number of the invalidated computations"),
+        ('recomputes', "Number of the recomputed computations"),
+        ('skipped', "Number of the recomputations skipped because the "
+         "dependencies were unchanged"),
+        ('flushes', "Number of the flush operations"),
+        ('requeued', "Number of the computations still invalidated after "
+         "being recomputed"),
+    )
+
+    def __init__(self, duration_buckets=DURATION_BUCKETS,
+                 fanout_buckets=FANOUT_BUCKETS):
+        for name, doc in self.COUNTERS:
+            setattr(self, name, 0)
+        self.flush_duration = Histogram(duration_buckets)
+        "Histogram of the duration of the flush operations, in seconds"
+        self.fanout = Histogram(fanout_buckets)
+        "Histogram of the number of the dependents notified by each change"
+
+    def as_dict(self):
+        """Return the statistics as a plain dictionary."""
+        result = {name: getattr(self, name) for name, doc in self.COUNTERS}
+        result['flush_duration'] = self.flush_duration.as_dict()
+        result['fanout'] = self.fanout.as_dict()
+        return result
+
+    def reset(self):
+        for name, doc in self.COUNTERS:
+            setattr(self, name, 0)
+        self.flush_duration.reset()
+        self.fanout.reset()
+
+    def to_openmetrics(self, prefix='reactive'):
+        """Return the statistics in the OpenMetrics text format.
+
+        :param prefix: the prefix of the metric names
+        """
+        lines = []
+        for name, doc in self.COUNTERS:
+            metric = '{}_{}'.format(prefix, name)
+            lines.append('# TYPE {} counter'.format(metric))
+            lines.append('# HELP {} {}.'.format(metric, doc))
+            lines.append('{}_total {}'.format(metric, getattr(self, name)))
+        for name, unit, doc, histogram in (
+                ('flush_duration', 'seconds', "Duration of the flush "
+                 "operations", self.flush_duration),
+                ('change_fanout', None, "Number of the dependents notified "
+                 "by each change", self.fanout)):
+            metric = '{}_{}'.format(prefix, name)
+            if unit:
+                metric = '{}_{}'.format(metric, unit)
+            data = histogram.as_dict()
+            lines.append('# TYPE {} histogram'.format(metric))
+            if unit:
+                lines.append('# UNIT {} {}'.format(metric, unit))
+            lines.append('# HELP {} {}.'.format(metric, doc))
+            for bound, count in data['buckets'].items():
+                lines.append('{}_bucket{{le="{}"}} {}'.format(metric, bound,
+                                                              count))
+            lines.append('{}_count {}'.format(metric, data['count']))
+            lines.append('{}_sum {}'.format(metric, data['sum']))
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+
+__all__ = ('Histogram', 'TrackerStats')
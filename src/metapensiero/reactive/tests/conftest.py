@@ -5,6 +5,8 @@
 # :License:   GNU General Public License version 3 or later
 #
 
+import functools
+
 import pytest
 
 from metapensiero.reactive import set_tracker
@@ -30,8 +32,29 @@ class Environment(object):
     def run_comp(self, func):
         return self.tracker.reactive(func)
 
+    async def flushed(self):
+        """Wait for the scheduled flush, and for those scheduled meanwhile,
+        from inside a coroutine."""
+        flusher = self.tracker.flusher
+        while flusher._flush_future is not None:
+            await flusher._flush_future
+
 @pytest.fixture(scope='function', params=FLUSHER_FACTORIES)
 def env(request, event_loop):
     flush_factory = request.param
     yield Environment(flush_factory, event_loop)
     set_tracker(None)
+
+
+@pytest.fixture(scope='function')
+def asyncio_tracker(event_loop):
+    """A factory of trackers using an :class:`AsyncioFlushManager` created
+    with the given options, like `min_interval` or `time_budget`. It returns
+    the tracker and its stats."""
+
+    def factory(**kwargs):
+        t = Tracker(functools.partial(AsyncioFlushManager, loop=event_loop,
+                                      **kwargs))
+        return t, t.enable_stats()
+
+    return factory
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# :Project:   metapensiero.reactive -- aggregates tests
+# :Created:   ven 16 ott 2026 21:13:12 CEST
+# :Author:    agent <agent@local>
+# :License:   GNU General Public License version 3 or later
+#
+
+import random
+
+from metapensiero import reactive
+from metapensiero.reactive.aggregate import Count, Max, Mean, Min, Sum, TopK
+
+
+def test_aggregates(env):
+
+    rd = reactive.ReactiveDict({'a': 1, 'b': 5, 'c': 3})
+    count = Count(rd)
+    odd = Count(rd, lambda v: v % 2)
+    total = Sum(rd)
+    mean = Mean(rd)
+    low = Min(rd)
+    high = Max(rd)
+    top = TopK(rd, 2)
+    assert (count(), odd(), total(), mean(), low(), high()) == (3, 3, 9, 3, 1,
+                                                                 5)
+    assert top() == [('b', 5), ('c', 3)]
+    results = []
+    comp = env.run_comp(lambda c: results.append((low.value, high.value)))
+    # neither the minimum nor the maximum move
+    rd['c'] = 4
+    assert not comp.invalidated
+    assert total() == 10
+    assert odd() == 2
+    assert top() == [('b', 5), ('c', 4)]
+    rd['d'] = 0
+    assert comp.invalidated
+    env.wait_for_flush()
+    assert results[-1] == (0, 5)
+    del rd['b']
+    env.wait_for_flush()
+    assert results[-1] == (0, 4)
+    assert top() == [('c', 4), ('a', 1)]
+    assert mean() == 5 / 3
+    for key in list(rd):
+        del rd[key]
+    assert (count(), total(), mean(), low(), high(), top()) == (
+        0, 0, None, None, None, [])
+    comp.stop()
+
+
+def test_heap_aggregates_random(env):
+
+    rnd = random.Random(42)
+    rd = reactive.ReactiveDict()
+    low = Min(rd, default=-1)
+    top = TopK(rd, 5, largest=False)
+    for i in range(2000):
+        key = rnd.randrange(100)
+        if key in rd.data and rnd.random() < 0.3:
+            del rd[key]
+        else:
+            rd[key] = rnd.randrange(1000)
+        values = sorted(rd.data.values())
+        assert low() == (values[0] if values else -1)
+        assert [v for k, v in top()] == values[:5]
+    # the removed entries are compacted
+    assert len(low._heap) <= 2 * len(rd.data) + 34
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# :Project:   metapensiero.reactive -- benchmarks tests
+# :Created:   ven 16 ott 2026 20:59:13 CEST
+# :Author:    agent <agent@local>
+# :License:   GNU General Public License version 3 or later
+#
+
+import json
+
+import pytest
+
+from metapensiero.reactive import bench
+from metapensiero.reactive.bench.__main__ import main
+
+
+@pytest.mark.parametrize('name', list(bench.SCENARIOS))
+def test_bench_scenario(name):
+
+    result = bench.run_scenario(name, scale=0.001, repeat=2)
+    assert result['name'] == name
+    assert result['ops'] > 0
+    assert 0 <= result['best'] <= result['mean']
+
+
+@pytest.mark.parametrize('name', ['fan_out', 'generator_fan_out',
+                                  'deep_chain', 'diamond', 'retrack',
+                                  'dict_updates'])
+def test_bench_scenario_recomputes(name):
+    """The workloads of the graph scenarios recompute what they are meant
+    to, running each flush to its end."""
+
+    sc = bench.SCENARIOS[name]
+    workload, ops = sc.func(**bench._scale_params(sc.params, 0.01))
+    try:
+        stats = workload.tracker.enable_stats()
+        workload()
+        assert stats.recomputes == workload.recomputes > 0
+        workload()
+        assert stats.recomputes == 2 * workload.recomputes
+    finally:
+        workload.close()
+
+
+def test_bench_compare():
+
+    baseline = bench.run(['fan_out'], scale=0.01, repeat=1)
+    current = json.loads(json.dumps(baseline))
+    current['results']['fan_out']['best'] *= 2
+    res = bench.compare(baseline, current, threshold=0.5)
+    assert len(res) == 1
+    assert res[0]['ratio'] == pytest.approx(2)
+    assert res[0]['regressed']
+    assert not bench.compare(baseline, current, threshold=1.5)[0]['regressed']
+    # runs with different parameters are not comparable
+    other = bench.run(['fan_out'], scale=0.02, repeat=1)
+    assert bench.compare(baseline, other) == []
+
+
+def test_bench_cli(tmpdir, capsys):
+
+    output = str(tmpdir.join('bench.json'))
+    assert main(['-s', '0.001', '-r', '1', '-o', output, 'retrack']) == 0
+    assert list(bench.load(output)['results']) == ['retrack']
+    assert main(['-s', '0.001', '-r', '1', '-c', output, '-t', '1000',
+                 'retrack']) == 0
+    assert 'retrack' in capsys.readouterr().out
@@ -7,11 +7,13 @@
 #
 
 import asyncio
+import sys
 
 import pytest
 
 from metapensiero.reactive.stream_utils import Sink
-from metapensiero.reactive.dependency import StreamDependency
+from metapensiero.reactive.computation import BaseComputation, Computation
+from metapensiero.reactive.dependency import Dependency, StreamDependency
 
 
 @pytest.mark.asyncio
@@ -79,3 +81,41 @@ async def test_stream_invalidate(event_loop, env):
 
     assert list(sink) == [(s1, 'a_value')]
     await sink.stop()
+
+
+def test_dependency_memory_budget(env):
+    t = env.tracker
+    dep = Dependency(tracker=t)
+    assert not hasattr(dep, '__dict__')
+
+    def size():
+        return sys.getsizeof(dep) + sys.getsizeof(dep._dependents)
+
+    assert size() <= Dependency.MEMORY_BUDGET
+    comps = [t.reactive(lambda c: dep.depend()) for i in range(3)]
+    assert len(dep._dependents) == 3
+    comps.pop().stop()
+    assert len(dep._dependents) == 2
+    assert size() <= Dependency.MEMORY_BUDGET
+    comps.pop().stop()
+    assert size() <= Dependency.MEMORY_BUDGET
+    assert not hasattr(comps[0], '__dict__')
+    comps[0].stop()
+    assert not dep.has_dependents
+
+
+def test_computation_memory_budget(env):
+    t = env.tracker
+    dep = Dependency(tracker=t)
+    base = BaseComputation(tracker=t)
+    assert not hasattr(base, '__dict__')
+    assert sys.getsizeof(base) <= BaseComputation.MEMORY_BUDGET
+    base.stop()
+    comp = t.reactive(lambda c: dep.depend())
+    assert type(comp) is Computation
+    assert not hasattr(comp, '__dict__')
+    assert sys.getsizeof(comp) <= Computation.MEMORY_BUDGET
+    # the signals are created on first access, outside of the instance
+    comp.on_invalidate.connect(lambda c: None)
+    assert sys.getsizeof(comp) <= Computation.MEMORY_BUDGET
+    comp.stop()
@@ -152,3 +152,26 @@ def test_chaindict():
                 ((operator.setitem, (dd, 'foo', 'zoo')),),]
     assert list(sink) == sink_res
     assert list(sink)[0][0][1][0] is dd
+
+
+def test_dict_lazy_key_dependencies(env):
+    d = reactive.ReactiveDict()
+    imm = env.run_comp(lambda c: d.immutables.depend())
+    for i in range(100):
+        d[i] = i
+    assert len(d._key_dependencies) == 0
+    assert d[5] == 5
+    assert len(d._key_dependencies) == 0
+    five = env.run_comp(lambda c: d[5])
+    assert list(d._key_dependencies) == [5]
+    assert imm.invalidated
+    env.wait_for_flush()
+    d[6] = 'six'
+    assert imm.invalidated
+    assert not five.invalidated
+    d[5] = 'five'
+    assert five.invalidated
+    del d[5]
+    assert len(d._key_dependencies) == 0
+    imm.stop()
+    five.stop()
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# :Project:   metapensiero.reactive -- offloaded values tests
+# :Created:   ven 16 ott 2026 21:06:53 CEST
+# :Author:    agent <agent@local>
+# :License:   GNU General Public License version 3 or later
+#
+
+import asyncio
+import concurrent.futures
+import threading
+
+import pytest
+
+from metapensiero import reactive
+
+
+def sum_squares(numbers):
+    return sum(n * n for n in numbers)
+
+
+@pytest.mark.asyncio
+async def test_offloaded_process_pool(env):
+
+    t = env.tracker
+    numbers = reactive.Value((1, 2, 3))
+    results = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=1) as pool:
+        total = t.offload(lambda: numbers.value, sum_squares, pool,
+                          initial_value=0)
+        comp = t.reactive(lambda c: results.append(total.value))
+        assert total.pending
+        assert results == [0]
+        assert await total.wait() == 14
+        await env.flushed()
+        assert results == [0, 14]
+        # same result, the reader isn't invalidated
+        numbers.value = (3, 2, 1)
+        await env.flushed()
+        await total.wait()
+        await env.flushed()
+        assert results == [0, 14]
+        numbers.value = (2,)
+        await env.flushed()
+        await total.wait()
+        await env.flushed()
+        assert results == [0, 14, 4]
+        comp.stop()
+        total.stop()
+    assert not numbers._dep.has_dependents
+
+
+@pytest.mark.asyncio
+async def test_offloaded_superseded(env):
+
+    t = env.tracker
+    source = reactive.Value(1)
+    gate = threading.Event()
+    calls = []
+
+    def slow(x):
+        calls.append(x)
+        gate.wait()
+        return x * 10
+
+    results = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+        value = t.offload(lambda: source.value, slow, pool)
+        comp = t.reactive(lambda c: results.append(value.value))
+        first = value._future
+        source.value = 2
+        await env.flushed()
+        assert value._future is not first
+        gate.set()
+        assert await value.wait() == 20
+        await asyncio.wait([first])
+        await env.flushed()
+        # the result of the first run has been discarded
+        assert results == [reactive.undefined, 20]
+        comp.stop()
+        value.stop()
+
+
+@pytest.mark.asyncio
+async def test_offloaded_error(env):
+
+    t = env.tracker
+    source = reactive.Value(1)
+    errors = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        value = t.offload(lambda: source.value, lambda x: 10 // x, pool,
+                          on_error=lambda v, e: errors.append(e))
+        assert value.value is reactive.undefined
+        assert await value.wait() == 10
+        source.value = 0
+        await env.flushed()
+        assert await value.wait() == 10
+        assert len(errors) == 1
+        assert isinstance(errors[0], ZeroDivisionError)
+        value.stop()
+
+
+@pytest.mark.asyncio
+async def test_threaded_parallel(env):
+
+    t = env.tracker
+    t.max_threads = 2
+    source = reactive.Value(1)
+    # each calculation waits for the other, they deadlock if run serially
+    barrier = threading.Barrier(2, timeout=5)
+    threads = set()
+
+    def work(x):
+        threads.add(threading.get_ident())
+        barrier.wait()
+        return x + 1
+
+    first = t.threaded(lambda: source.value, work)
+    second = t.threaded(lambda: source.value * 2, work)
+    results = []
+    comp = t.reactive(lambda c: results.append((first.value, second.value)))
+    assert await first.wait() == 2
+    assert await second.wait() == 3
+    await env.flushed()
+    assert results[-1] == (2, 3)
+    source.value = 2
+    await env.flushed()
+    await first.wait()
+    await second.wait()
+    await env.flushed()
+    assert results[-1] == (3, 5)
+    assert threading.get_ident() not in threads
+    assert t.thread_executor._max_workers == 2
+    comp.stop()
+    first.stop()
+    second.stop()
+    t.thread_executor.shutdown()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# :Project:   metapensiero.reactive -- graph snapshot tests
+# :Created:   ven 16 ott 2026 20:57:29 CEST
+# :Author:    agent <agent@local>
+# :License:   GNU General Public License version 3 or later
+#
+
+import json
+
+from metapensiero import reactive
+
+
+def test_graph_snapshot(env):
+
+    v = reactive.Value(1)
+    rd = reactive.ReactiveDict(a=1)
+
+    def parent(comp):
+        v.value
+
+        def child(comp):
+            rd['a']
+
+        env.run_comp(child)
+
+    def other(comp):
+        v.value
+        rd.keys()
+
+    c1 = env.run_comp(parent)
+    c2 = env.run_comp(other)
+    snapshot = env.tracker.graph_snapshot()
+    labels = {n['label'] for n in snapshot.nodes.values()}
+    assert "ReactiveDict['a']" in labels
+    assert 'ReactiveDict.structure' in labels
+    # followers of the dict structure are found too
+    assert 'ReactiveDict.all' in labels
+    assert 'ReactiveDict.all_values' in labels
+    stats = snapshot.stats()
+    assert stats['nodes_by_type']['Computation'] == 3
+    assert stats['edges_by_kind']['parent'] == 1
+    assert stats['edges_by_kind']['depends'] == 4
+    assert stats['edges_by_kind']['follows'] == 6
+    assert stats['max_depth'] == 1
+    assert stats['top_fan_out'][0]['fan_out'] == 2
+    assert stats['top_fan_out'][0]['label'] == 'Value'
+    assert sum(stats['fan_in'].values()) == stats['nodes']
+    data = json.loads(snapshot.to_json())
+    assert len(data['nodes']) == stats['nodes']
+    assert len(data['edges']) == stats['edges']
+    dot = snapshot.to_dot()
+    assert dot.startswith('digraph "reactive" {')
+    assert '[label="ReactiveDict[\'a\']", shape=ellipse];' in dot
+    assert '[style=dashed];' in dot
+    c1.stop()
+    c2.stop()
+    assert env.tracker.graph_snapshot().nodes == {}
+
+
+def test_graph_value_names(env):
+
+    class Item:
+
+        price = reactive.Value()
+
+        @reactive.Value
+        def total(self):
+            return self.price * 2
+
+    item = Item()
+    item.price = 1
+    comp = env.run_comp(lambda c: item.total)
+    labels = {n['label'] for n in env.tracker.graph_snapshot().nodes.values()}
+    assert any(l.endswith('Item.price') for l in labels)
+    assert any(l.endswith('Item.total') for l in labels)
+    comp.stop()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# :Project:   metapensiero.reactive -- secondary indexes tests
+# :Created:   ven 16 ott 2026 21:12:10 CEST
+# :Author:    agent <agent@local>
+# :License:   GNU General Public License version 3 or later
+#
+
+import collections
+
+import pytest
+
+from metapensiero import reactive
+
+
+User = collections.namedtuple('User', 'name status')
+
+
+def test_index(env):
+
+    users = reactive.ReactiveDict({
+        1: User('ann', 'active'),
+        2: User('bob', 'idle'),
+        3: User('cid', 'active'),
+    })
+    index = users.create_index('status')
+    assert users.get_index('status') is index
+    assert index['active'] == {1, 3}
+    assert index['banned'] == frozenset()
+    results = []
+    active = env.run_comp(lambda c: results.append(index['active']))
+    idle = env.run_comp(lambda c: index['idle'])
+    buckets = env.run_comp(lambda c: index.buckets())
+    # the value changes, the membership doesn't
+    users[1] = User('anne', 'active')
+    assert not active.invalidated
+    users[2] = User('bob', 'active')
+    assert active.invalidated
+    assert idle.invalidated
+    # the idle bucket is gone
+    assert buckets.invalidated
+    env.wait_for_flush()
+    assert results[-1] == {1, 2, 3}
+    del users[3]
+    users[4] = User('dan', 'banned')
+    env.wait_for_flush()
+    assert results[-1] == {1, 2}
+    assert index.count('banned') == 1
+    assert sorted(index.buckets()) == ['active', 'banned']
+    with pytest.raises(ValueError):
+        users.create_index('status')
+    users.drop_index('status')
+    with pytest.raises(KeyError):
+        users.get_index('status')
+    users[5] = User('eve', 'active')
+    assert not active.invalidated
+    for comp in (active, idle, buckets):
+        comp.stop()
+
+
+def test_index_keyfunc(env):
+
+    rd = reactive.ReactiveDict({k: k for k in range(10)})
+    index = rd.create_index('parity', lambda v: v % 2)
+    assert index[0] == {0, 2, 4, 6, 8}
+    rd[0] = 1
+    assert index[1] == {0, 1, 3, 5, 7, 9}
+    assert 0 in index
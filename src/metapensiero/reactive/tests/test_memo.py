@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# :Project:   metapensiero.reactive -- memo tests
+# :Created:   ven 16 ott 2026 20:50:35 CEST
+# :Author:    agent <agent@local>
+# :License:   GNU General Public License version 3 or later
+#
+
+import pytest
+
+from metapensiero import reactive
+
+
+def test_memo_lazy(env):
+
+    v = reactive.Value(1)
+    runs = []
+
+    @reactive.computed
+    def double():
+        runs.append(v.value)
+        return v.value * 2
+
+    assert runs == []
+    assert double.stale
+    assert double() == 2
+    assert double.value == 2
+    assert runs == [1]
+    v.value = 2
+    env.wait_for_flush()
+    # nobody depends on it, so it stays stale until read
+    assert double.stale
+    assert runs == [1]
+    v.value = 3
+    env.wait_for_flush()
+    assert double() == 6
+    assert runs == [1, 3]
+    double.stop()
+
+
+def test_memo_equality_cutoff(env):
+
+    t = env.tracker
+    v = reactive.Value(1)
+    parity = reactive.Memo(lambda: v.value % 2)
+    label = reactive.Memo(lambda: 'odd' if parity() else 'even')
+    results = []
+
+    comp = t.reactive(lambda c: results.append(label()))
+    assert results == ['odd']
+    v.value = 3
+    env.wait_for_flush()
+    assert results == ['odd']
+    assert not parity.stale
+    v.value = 4
+    env.wait_for_flush()
+    assert results == ['odd', 'even']
+    comp.stop()
+    label.stop()
+    parity.stop()
+
+
+def test_memo_method(env):
+
+    t = env.tracker
+
+    class Item:
+
+        price = reactive.Value()
+
+        def __init__(self, price):
+            self.price = price
+
+        @reactive.computed
+        def taxed(self):
+            return self.price * 2
+
+    a = Item(10)
+    b = Item(20)
+    results = []
+    comp = t.reactive(lambda c: results.append((a.taxed, b.taxed)))
+    assert results == [(20, 40)]
+    a.price = 15
+    env.wait_for_flush()
+    assert results == [(20, 40), (30, 40)]
+    with pytest.raises(AttributeError):
+        a.taxed = 1
+    comp.stop()
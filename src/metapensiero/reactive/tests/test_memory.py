@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# :Project:   metapensiero.reactive -- memory accounting tests
+# :Created:   ven 16 ott 2026 21:00:36 CEST
+# :Author:    agent <agent@local>
+# :License:   GNU General Public License version 3 or later
+#
+
+import tracemalloc
+
+import pytest
+
+from metapensiero import reactive
+
+
+def test_memory_report(env):
+
+    class Item:
+
+        price = reactive.Value()
+
+    items = [Item() for i in range(10)]
+    for i, item in enumerate(items):
+        item.price = i
+    total = reactive.Value(0)
+    rd = reactive.ReactiveDict(a=1)
+
+    def read(comp):
+        total.value
+        rd['a']
+        rd.keys()
+        sum(item.price for item in items)
+
+    comp = env.run_comp(read)
+    report = env.tracker.memory_report()
+    kinds = report.kinds
+    assert kinds['computations']['count'] == 1
+    # total, the item prices, the 'a' key and the dict structure, that
+    # brings in its followers
+    assert kinds['dependencies']['count'] == 1 + 10 + 1 + 6
+    assert kinds['following maps']['count'] == 1 + 6
+    assert kinds['value descriptors']['count'] == 2
+    assert kinds['signal subscribers']['count'] > 0
+    assert all(k['size'] > 0 for name, k in kinds.items()
+               if name != 'stream queues')
+    assert report.total == sum(k['size'] for k in kinds.values())
+    assert report.traced is None
+    assert 'total' in report.format()
+    # explicit objects are accounted only once
+    again = env.tracker.memory_report(total)
+    assert again.kinds['value descriptors'] == kinds['value descriptors']
+    with pytest.raises(TypeError):
+        env.tracker.memory_report(object())
+    comp.stop()
+
+
+def test_memory_report_tracemalloc(env):
+
+    tracemalloc.start()
+    try:
+        v = reactive.Value(1)
+        comps = [env.run_comp(lambda c: v.value) for i in range(100)]
+        report = env.tracker.memory_report()
+    finally:
+        tracemalloc.stop()
+    assert report.traced_total > 0
+    assert 0 < sum(report.traced.values()) <= report.traced_total
+    assert 'computation.py' in report.traced
+    assert report.as_dict()['traced'] == report.traced
+    for c in comps:
+        c.stop()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# :Project:   metapensiero.reactive -- profiler tests
+# :Created:   ven 16 ott 2026 20:55:56 CEST
+# :Author:    agent <agent@local>
+# :License:   GNU General Public License version 3 or later
+#
+
+import pytest
+
+from metapensiero import reactive
+from metapensiero.reactive.exception import ReactiveError
+
+
+def test_profile(env):
+
+    v = reactive.Value(1)
+
+    def cheap(comp):
+        v.value
+
+    def expensive(comp):
+        sum(range(v.value * 10000))
+
+    with env.tracker.profile() as profiler:
+        c1 = env.run_comp(cheap)
+        c2 = env.run_comp(expensive)
+        v.value = 2
+        env.wait_for_flush()
+    assert env.tracker._profiler is None
+    report = profiler.report()
+    assert [p.name.rsplit('.', 1)[-1] for p in report] == ['expensive',
+                                                            'cheap']
+    hot = report[0]
+    assert hot.calls == 2
+    assert hot.requeued == 0
+    assert hot.total_time >= hot.max_time > 0
+    assert hot.triggers == {'Value': 1}
+    assert profiler.flushes == 1
+    text = profiler.format_report()
+    assert 'expensive' in text
+    assert 'triggered by Value (1 times)' in text
+    # outside the block nothing is recorded
+    v.value = 3
+    env.wait_for_flush()
+    assert hot.calls == 2
+    c1.stop()
+    c2.stop()
+
+
+def test_profile_names(env):
+
+    v = reactive.Value(1)
+
+    class Cart:
+
+        @reactive.computed
+        def total(self):
+            return v.value * 2
+
+    cart = Cart()
+    with env.tracker.profile() as profiler:
+        assert cart.total == 2
+        with pytest.raises(ReactiveError):
+            with env.tracker.profile():
+                pass
+    names = list(profiler.profiles)
+    assert len(names) == 1
+    assert names[0].endswith('Cart.total')
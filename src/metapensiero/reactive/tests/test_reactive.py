@@ -6,9 +6,15 @@
 # :Copyright: Copyright (C) 2016 Alberto Berti
 #
 
+import asyncio
+import operator
+import weakref
+
 import pytest
 
 from metapensiero import reactive
+from metapensiero.reactive import aggregate
+from metapensiero.reactive.dependency import Dependency
 
 
 def test_computation_invalidation(env):
@@ -482,3 +488,691 @@ def test_value_undefined(env):
     a = A()
     with pytest.raises(AttributeError):
         a.v.value
+
+
+def test_flush_height_order(env):
+    """A computation that reads both a value and something derived from it
+    must run only once per change and never see an half-updated state."""
+
+    t = env.tracker
+    v = reactive.Value(1)
+    double = reactive.Value(0)
+    results = []
+
+    def writer(comp):
+        double.value = v.value * 2
+
+    def reader(comp):
+        results.append((v.value, double.value))
+
+    w = t.reactive(writer)
+    r = t.reactive(reader)
+    assert r._height > w._height
+    assert results == [(1, 2)]
+    v.value = 2
+    env.wait_for_flush()
+    assert results == [(1, 2), (2, 4)]
+    v.value = 3
+    env.wait_for_flush()
+    assert results == [(1, 2), (2, 4), (3, 6)]
+    w.stop()
+    r.stop()
+
+
+def test_flush_height_order_reader_first(env):
+    """The same when the reader is created before the writer, its height is
+    raised when the writer starts producing what it reads."""
+
+    t = env.tracker
+    v = reactive.Value(1)
+    double = reactive.Value(2)
+    results = []
+
+    def writer(comp):
+        double.value = v.value * 2
+
+    def reader(comp):
+        results.append((v.value, double.value))
+
+    r = t.reactive(reader)
+    w = t.reactive(writer)
+    assert r._height > w._height
+    assert results == [(1, 2)]
+    v.value = 2
+    env.wait_for_flush()
+    assert results == [(1, 2), (2, 4)]
+    w.stop()
+    r.stop()
+
+
+def test_pending_queue(env):
+
+    from metapensiero.reactive.flush.base import PendingQueue
+
+    t = env.tracker
+    dep = t.dependency()
+    comps = [t.reactive(lambda c: dep.depend()) for i in range(3)]
+    low, normal, high = comps
+    low.priority = reactive.PRIORITY.LOW
+    high.priority = reactive.PRIORITY.HIGH
+    q = PendingQueue()
+    for c in comps + comps:
+        q.push(c)
+    assert len(q) == 3
+    assert list(q) == [high, normal, low]
+    q.discard(normal)
+    assert normal not in q
+    assert len(q) == 2
+    assert q.pop() is high
+    assert q.pop() is low
+    assert len(q) == 0
+    with pytest.raises(KeyError):
+        q.pop()
+    for c in comps:
+        c.stop()
+
+
+def test_flush_priority(env):
+
+    t = env.tracker
+    v = reactive.Value(1)
+    results = []
+
+    def background(comp):
+        results.append(('background', v.value))
+
+    def urgent(comp):
+        results.append(('urgent', v.value))
+
+    b = t.reactive(background, priority=reactive.PRIORITY.LOW)
+    u = t.reactive(urgent, priority=reactive.PRIORITY.HIGH)
+    results.clear()
+    v.value = 2
+    env.wait_for_flush()
+    assert results == [('urgent', 2), ('background', 2)]
+    b.stop()
+    assert b not in t.flusher._pending
+    u.stop()
+
+
+def test_flush_priority_producer(env, caplog):
+    """The producer of a value read by an high priority computation is
+    promoted to its lane, so that it's still recomputed first."""
+
+    t = env.tracker
+    v = reactive.Value(1)
+    double = reactive.Value(lambda: v.value * 2)
+    results = []
+
+    def urgent(comp):
+        results.append((v.value, double.value))
+
+    u = t.reactive(urgent, priority=reactive.PRIORITY.HIGH)
+    producer = double._comp
+    assert producer.priority == reactive.PRIORITY.HIGH
+    v.value = 2
+    env.wait_for_flush()
+    assert results == [(1, 2), (2, 4)]
+    assert 'needs still a recalculation' not in caplog.text
+    u.stop()
+    producer.stop()
+
+
+def test_flush_priority_producer_demoted(env):
+    """The producer gets back to its own lane when the reader that
+    promoted it goes away."""
+
+    t = env.tracker
+    v = reactive.Value(1)
+    double = reactive.Value(lambda: v.value * 2)
+    n = t.reactive(lambda c: double.value)
+    u = t.reactive(lambda c: double.value, priority=reactive.PRIORITY.HIGH)
+    producer = double._comp
+    assert producer.priority == reactive.PRIORITY.HIGH
+    u.stop()
+    assert producer.priority == reactive.PRIORITY.NORMAL
+    n.priority = reactive.PRIORITY.HIGH
+    assert producer.priority == reactive.PRIORITY.HIGH
+    n.priority = reactive.PRIORITY.LOW
+    assert producer.priority == reactive.PRIORITY.NORMAL
+    n.stop()
+    producer.stop()
+
+
+def test_flush_priority_fan_out(env):
+    """Reading a produced value doesn't look at all its readers, so the
+    cost of a flush stays linear with the fan-out."""
+
+    class Counting(set):
+        iterations = 0
+
+        def __iter__(self):
+            Counting.iterations += 1
+            return super().__iter__()
+
+    t = env.tracker
+    v = reactive.Value(1)
+    double = reactive.Value(lambda: v.value * 2)
+
+    def scans(readers):
+        comps = [t.reactive(lambda c: double.value) for i in range(readers)]
+        dep = double._dep
+        dep._dependents = Counting(dep._dependents)
+        Counting.iterations = 0
+        v.value += 1
+        env.wait_for_flush()
+        count = Counting.iterations
+        for comp in comps:
+            comp.stop()
+        return count
+
+    assert scans(100) == scans(10)
+    double._comp.stop()
+
+
+def test_batch(env):
+
+    t = env.tracker
+    a = reactive.Value(1)
+    b = reactive.Value(2)
+    results = []
+
+    def autorun(comp):
+        results.append(a.value + b.value)
+
+    comp = t.reactive(autorun)
+    with t.batch():
+        a.value = 10
+        b.value = 20
+        assert not comp.invalidated
+        with t.batch():
+            a.value = 100
+        assert not comp.invalidated
+    assert comp.invalidated
+    env.wait_for_flush()
+    assert results == [3, 120]
+    comp.stop()
+
+
+def test_incremental(env):
+
+    t = env.tracker
+    rd = reactive.ReactiveDict({k: k for k in range(100)})
+    factor = reactive.Value(1)
+    mirror = {}
+    total = 0
+    received = []
+
+    def update(comp, changes):
+        nonlocal total
+        received.append(changes)
+        rd.immutables.depend()
+        factor.value
+        if changes is None or factor._dep in changes:
+            mirror.clear()
+            mirror.update(rd.data)
+            total = sum(mirror.values()) * factor.value
+            return
+        for values in changes[rd.immutables]:
+            for op, args in values:
+                if op is operator.setitem:
+                    key, value = args[1:]
+                    total += (value - mirror.get(key, 0)) * factor.value
+                    mirror[key] = value
+                else:
+                    total -= mirror.pop(args[1]) * factor.value
+
+    comp = t.incremental(update)
+    assert received == [None]
+    assert total == 4950
+    rd[3] = 10
+    rd[200] = 1
+    del rd[5]
+    env.wait_for_flush()
+    assert list(received[1]) == [rd.immutables]
+    assert len(received[1][rd.immutables]) == 3
+    assert total == sum(rd.data.values())
+    factor.value = 2
+    env.wait_for_flush()
+    assert received[2] == {factor._dep: []}
+    assert total == sum(rd.data.values()) * 2
+    comp.invalidate()
+    env.wait_for_flush()
+    assert received[3] is None
+    subscribers = len(rd.immutables.on_change.subscribers)
+    comp.stop()
+    assert len(rd.immutables.on_change.subscribers) == subscribers - 1
+
+
+@pytest.mark.asyncio
+async def test_batch_async(env):
+
+    t = env.tracker
+    d = reactive.ReactiveDict()
+    results = []
+    comp = t.reactive(lambda c: results.append(len(d.keys())))
+    sink = d.structure.sink()
+    sink.start()
+    async with t.batch(coalesce=True):
+        d['foo'] = 1
+        d['bar'] = 2
+    assert comp.invalidated
+    await t.flusher._flush_future
+    assert results == [0, 2]
+    assert len(list(sink)) == 1
+    comp.stop()
+
+
+def test_batch_coalesce(env):
+    """A coalescing batch emits a single event with all the payloads, so
+    that nothing is lost by the incremental computations and the views."""
+
+    t = env.tracker
+    rd = reactive.ReactiveDict()
+    total = aggregate.Sum(rd)
+    count = aggregate.Count(rd)
+    odd = rd.filter(lambda v: v % 2)
+    received = []
+
+    def autorun(comp, changes):
+        rd.immutables.depend()
+        received.append(changes)
+
+    comp = t.incremental(autorun)
+    sink = rd.all.sink()
+    sink.start()
+    with t.batch(coalesce=True):
+        rd['a'] = 1
+        rd['b'] = 2
+        rd['c'] = 3
+        rd['a'] = 5
+    assert len(list(sink)) == 2
+    assert total() == 10
+    assert count() == 3
+    assert dict(odd.data) == {'a': 5, 'c': 3}
+    env.wait_for_flush()
+    assert [values[0][1][1:] for values in received[-1][rd.immutables]] == [
+        ('a', 1), ('b', 2), ('c', 3), ('a', 5)]
+    # the views take the last value even if the events of the addition
+    # are notified after those of the following change
+    with t.batch():
+        rd['d'] = 7
+        rd['d'] = 9
+    assert odd.data['d'] == 9
+    assert total() == 19
+    sink.stop()
+    comp.stop()
+    for obj in (total, count, odd):
+        obj.stop()
+
+
+def test_batch_commit_error(env):
+
+    t = env.tracker
+
+    class Failing(Dependency):
+
+        def _commit(self, payloads, coalesce=False):
+            raise RuntimeError('boom')
+
+    a = Failing(tracker=t)
+    b = t.dependency()
+    comp = t.reactive(lambda c: (a.depend(), b.depend()))
+    with pytest.raises(RuntimeError):
+        with t.batch():
+            a.changed()
+            b.changed()
+    # the change of the other dependency has been committed anyway
+    assert comp.invalidated
+    comp.stop()
+
+
+def test_incremental_retracking(env):
+
+    t = env.tracker
+    flag = reactive.Value(True)
+    a = t.dependency()
+    b = t.dependency()
+
+    def autorun(comp):
+        if flag.value:
+            a.depend()
+        else:
+            b.depend()
+
+    comp = t.reactive(autorun)
+    assert set(comp._dependencies) == {flag._dep, a}
+    a.changed()
+    assert comp in a._dependents
+    env.wait_for_flush()
+    assert set(comp._dependencies) == {flag._dep, a}
+    flag.value = False
+    env.wait_for_flush()
+    assert set(comp._dependencies) == {flag._dep, b}
+    assert comp not in a._dependents
+    assert comp in b._dependents
+    comp.stop()
+    assert not (flag._dep.has_dependents or a.has_dependents or
+                b.has_dependents)
+
+
+def test_version_skip_recompute(env):
+
+    t = env.tracker
+    v = reactive.Value('A')
+    results = []
+
+    comp = t.reactive(lambda c: results.append(v.value))
+    v.value = 'B'
+    v.value = 'A'
+    assert comp.invalidated
+    env.wait_for_flush()
+    assert not comp.invalidated
+    assert results == ['A']
+    v.value = 'B'
+    env.wait_for_flush()
+    assert results == ['A', 'B']
+    # an explicit invalidation always recomputes
+    v.value = 'C'
+    v.value = 'B'
+    comp.invalidate()
+    env.wait_for_flush()
+    assert results == ['A', 'B', 'B']
+    comp.stop()
+
+
+def test_version_base_released(env):
+    """The value recorded at the start of the flush cycle is released at
+    its end."""
+
+    class Box:
+        pass
+
+    t = env.tracker
+    first = Box()
+    v = reactive.Value(first)
+    comp = t.reactive(lambda c: v.value)
+    ref = weakref.ref(first)
+    v.value = Box()
+    del first
+    assert ref() is not None
+    env.wait_for_flush()
+    assert ref() is None
+    assert not t.flusher._touched
+    comp.stop()
+
+
+def test_owner_collected(env):
+
+    import gc
+
+    t = env.tracker
+    dep = t.dependency()
+
+    class Owner:
+
+        @reactive.Value
+        def dependent(self):
+            dep.depend()
+            return True
+
+    o = Owner()
+    assert o.dependent is True
+    assert dep.has_dependents
+    del o
+    gc.collect()
+    assert t.collect() == 1
+    assert not dep.has_dependents
+    assert t.collect() == 0
+
+
+def test_collect_orphans(env):
+
+    import gc
+
+    t = reactive.Tracker(env.ff, collect_orphans=True)
+    t.flusher.loop = env.loop
+    dep = t.dependency()
+    t.reactive(lambda c: dep.depend())
+    gc.collect()
+    assert len(t._computations) == 1
+    del dep
+    gc.collect()
+    assert len(t._computations) == 0
+    assert t.collect() == 1
+    assert t.reclaimed == 1
+
+
+def test_threadsafe_changes(env):
+
+    import functools
+    import threading
+    from metapensiero.reactive.flush.asyncio import AsyncioFlushManager
+
+    t = reactive.Tracker(functools.partial(AsyncioFlushManager,
+                                           loop=env.loop, threadsafe=True))
+    stats = t.enable_stats()
+    values = [reactive.Value(0, tracker=t) for i in range(4)]
+    rd = reactive.ReactiveDict(tracker=t)
+    results = []
+    events = []
+    rd.all.on_change.connect(lambda *changes: events.append(changes))
+
+    def autorun(comp):
+        results.append([v.value for v in values] + [len(rd.keys())])
+
+    comp = t.reactive(autorun)
+
+    def worker(value):
+        for i in range(1, 501):
+            value.value = i
+        rd[id(value)] = True
+
+    threads = [threading.Thread(target=worker, args=(v,)) for v in values]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    # nothing has been applied yet
+    assert not comp.invalidated
+    # the dict notifies both its structure and its values
+    assert len(t.flusher.inbox) == 2000 + 4 * 2
+    assert events == []
+    env.loop.run_until_complete(asyncio.sleep(0.01))
+    assert len(t.flusher.inbox) == 0
+    assert t.flusher._flush_future is None
+    assert results == [[0, 0, 0, 0, 0], [500, 500, 500, 500, 4]]
+    assert stats.flushes == 1
+    # all the events are delivered, as if the changes were made on the loop
+    assert len(events) == 2 * 4
+    # changes from the loop thread are applied immediately
+    values[0].value = 1
+    assert comp.invalidated
+    env.loop.run_until_complete(t.flusher._flush_future)
+    assert results[-1] == [1, 500, 500, 500, 4]
+    comp.stop()
+
+
+@pytest.mark.asyncio
+async def test_async_autorun(env):
+
+    t = env.tracker
+    a = reactive.Value(1)
+    b = reactive.Value(2)
+    c = reactive.Value(3)
+    results = []
+
+    async def autorun(comp):
+        x = a.value
+        await asyncio.sleep(0)
+        results.append(x + b.value)
+
+    comp = t.async_autorun(autorun)
+    # a synchronous computation running while the coroutine is suspended
+    other = t.reactive(lambda comp: c.value)
+    await comp.task
+    assert results == [3]
+    assert set(comp._dependencies) == {a._dep, b._dep}
+    assert set(other._dependencies) == {c._dep}
+    assert not t.active
+    b.value = 3
+    await env.flushed()
+    await comp.task
+    assert results == [3, 4]
+    comp.stop()
+    other.stop()
+    assert not a._dep.has_dependents
+
+
+@pytest.mark.asyncio
+async def test_async_autorun_cancel(env):
+
+    t = env.tracker
+    a = reactive.Value(1)
+    b = reactive.Value(1)
+    gate = asyncio.Event()
+    started = []
+    results = []
+
+    async def autorun(comp):
+        v = a.value
+        if v == 1:
+            b.value
+        started.append(v)
+        await gate.wait()
+        results.append(v)
+
+    comp = t.async_autorun(autorun)
+    await asyncio.sleep(0)
+    assert started == [1]
+    first = comp.task
+    a.value = 2
+    assert comp.invalidated
+    await env.flushed()
+    await asyncio.sleep(0)
+    assert first.cancelled()
+    assert started == [1, 2]
+    gate.set()
+    await comp.task
+    assert results == [2]
+    # the dependencies of the cancelled run are dropped when one completes
+    assert not b._dep.has_dependents
+    comp.stop()
+
+
+@pytest.mark.asyncio
+async def test_async_autorun_error(env):
+
+    t = env.tracker
+    a = reactive.Value(1)
+    errors = []
+
+    async def autorun(comp):
+        await asyncio.sleep(0)
+        if a.value > 1:
+            raise ValueError(a.value)
+
+    comp = t.async_autorun(autorun,
+                           on_error=lambda comp, e: errors.append(e))
+    await comp.task
+    a.value = 2
+    await env.flushed()
+    await comp.task
+    assert [e.args for e in errors] == [(2,)]
+    comp.stop()
+
+
+@pytest.mark.asyncio
+async def test_debounced_flush(env, asyncio_tracker):
+
+    t, stats = asyncio_tracker(min_interval=0.1, max_latency=0.3)
+    v = reactive.Value(0, tracker=t)
+    results = []
+    comp = t.reactive(lambda c: results.append(v.value))
+    for i in range(1, 6):
+        v.value = i
+        await asyncio.sleep(0.01)
+    # the requests keep postponing the flush
+    assert stats.flushes == 0
+    await t.flusher._flush_future
+    assert results == [0, 5]
+    assert stats.flushes == 1
+    # but no more than max_latency: the flush happens while the requests
+    # are still coming, not before max_latency has elapsed. The upper bound
+    # isn't checked against the clock as it depends on the load of the host
+    flushed = []
+    t.flusher.on_after_flush.connect(
+        lambda: flushed.append(env.loop.time()))
+    started = env.loop.time()
+    for i in range(100):
+        v.value = 10 + i
+        await asyncio.sleep(0.01)
+        if stats.flushes > 1:
+            break
+    assert stats.flushes == 2
+    assert flushed[0] - started >= 0.3
+    comp.stop()
+
+
+@pytest.mark.asyncio
+async def test_debounced_flush_high_priority(env, asyncio_tracker):
+
+    t, stats = asyncio_tracker(min_interval=0.05)
+    v = reactive.Value(0, tracker=t)
+    urgent = []
+    normal = []
+    c1 = t.reactive(lambda c: normal.append(v.value))
+    c2 = t.reactive(lambda c: urgent.append(v.value),
+                    priority=reactive.PRIORITY.HIGH)
+    v.value = 1
+    await asyncio.sleep(0)
+    assert urgent == [0, 1]
+    assert normal == [0]
+    v.value = 2
+    await asyncio.sleep(0)
+    assert urgent == [0, 1, 2]
+    await t.flusher._flush_future
+    assert normal == [0, 2]
+    c1.stop()
+    c2.stop()
+
+
+@pytest.mark.asyncio
+async def test_sliced_flush(env, asyncio_tracker):
+    import time
+
+    t, stats = asyncio_tracker(time_budget=0.01)
+    v = reactive.Value(0, tracker=t)
+    results = []
+    events = []
+
+    def slow(comp):
+        results.append(v.value)
+        time.sleep(0.001)
+
+    comps = [t.reactive(slow) for i in range(50)]
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    task = asyncio.ensure_future(ticker())
+    t.flusher.on_before_flush.connect(lambda comps: events.append('before'))
+    t.on_after_flush(lambda: events.append('after'))
+    epoch = t.flusher._epoch
+    v.value = 1
+    future = t.flusher._flush_future
+    await future
+    task.cancel()
+    assert results.count(1) == 50
+    assert events == ['before', 'after']
+    # the slices make a single flush cycle
+    assert t.flusher._epoch == epoch + 1
+    # the loop has run other tasks between the slices
+    assert stats.flushes > 1
+    assert ticks >= stats.flushes - 1
+    for c in comps:
+        c.stop()
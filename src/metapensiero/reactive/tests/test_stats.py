@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# :Project:   metapensiero.reactive -- statistics tests
+# :Created:   ven 16 ott 2026 20:54:34 CEST
+# :Author:    agent <agent@local>
+# :License:   GNU General Public License version 3 or later
+#
+
+from metapensiero import reactive
+from metapensiero.reactive.stats import Histogram
+
+
+def test_stats_disabled_by_default(env):
+
+    assert env.tracker.stats is None
+    v = reactive.Value(1)
+    env.run_comp(lambda c: v.value)
+    v.value = 2
+    env.wait_for_flush()
+    assert env.tracker.stats is None
+
+
+def test_stats_counters(env):
+
+    stats = env.tracker.enable_stats()
+    v = reactive.Value(1)
+    results = []
+    comps = [env.run_comp(lambda c: results.append(v.value))
+             for i in range(3)]
+    assert stats.depends == 3
+    v.value = 2
+    env.wait_for_flush()
+    assert stats.changes == 1
+    assert stats.invalidations == 3
+    assert stats.recomputes == 3
+    assert stats.flushes == 1
+    assert stats.flush_duration.count == 1
+    assert stats.fanout.count == 1
+    assert stats.fanout.sum == 3
+    # going back and forth is skipped
+    v.value = 3
+    v.value = 2
+    env.wait_for_flush()
+    assert stats.skipped == 3
+    assert stats.recomputes == 3
+    data = stats.as_dict()
+    assert data['changes'] == 3
+    assert data['fanout']['buckets']['5'] == 3
+    assert data['fanout']['buckets']['+Inf'] == 3
+    for c in comps:
+        c.stop()
+    assert env.tracker.disable_stats() is stats
+    assert env.tracker.stats is None
+
+
+def test_histogram():
+
+    h = Histogram([1, 10])
+    for value in (0.5, 1, 5, 20):
+        h.observe(value)
+    assert h.as_dict() == {
+        'buckets': {'1': 2, '10': 3, '+Inf': 4},
+        'count': 4,
+        'sum': 26.5,
+    }
+
+
+def test_stats_openmetrics(env):
+
+    stats = env.tracker.enable_stats()
+    v = reactive.Value(1)
+    env.run_comp(lambda c: v.value)
+    v.value = 2
+    env.wait_for_flush()
+    text = stats.to_openmetrics()
+    lines = text.splitlines()
+    assert '# TYPE reactive_recomputes counter' in lines
+    assert 'reactive_recomputes_total 1' in lines
+    assert '# TYPE reactive_flush_duration_seconds histogram' in lines
+    assert 'reactive_flush_duration_seconds_bucket{le="+Inf"} 1' in lines
+    assert 'reactive_change_fanout_count 1' in lines
+    assert lines[-1] == '# EOF'
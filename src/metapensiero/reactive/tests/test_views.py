@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+# :Project:   metapensiero.reactive -- dict views tests
+# :Created:   ven 16 ott 2026 21:11:10 CEST
+# :Author:    agent <agent@local>
+# :License:   GNU General Public License version 3 or later
+#
+
+import gc
+import random
+import weakref
+
+import pytest
+
+from metapensiero import reactive
+from metapensiero.reactive.aggregate import Sum
+
+
+def test_map_view(env):
+
+    rd = reactive.ReactiveDict({'a': 1, 'b': 2})
+    calls = []
+
+    def tenfold(value):
+        calls.append(value)
+        return value * 10
+
+    view = rd.map(tenfold)
+    assert dict(view.data) == {'a': 10, 'b': 20}
+    reader = env.run_comp(lambda c: view['a'])
+    other = env.run_comp(lambda c: view['b'])
+    del calls[:]
+    rd['a'] = 3
+    # only the changed key is mapped, once
+    assert calls == [3]
+    assert view.data['a'] == 30
+    assert reader.invalidated
+    assert not other.invalidated
+    rd['c'] = 5
+    del rd['b']
+    assert dict(view.data) == {'a': 30, 'c': 50}
+    assert other.invalidated
+    with pytest.raises(TypeError):
+        view['d'] = 1
+    view.stop()
+    rd['a'] = 4
+    assert view.data['a'] == 30
+    reader.stop()
+    other.stop()
+
+
+def test_map_view_containers(env):
+
+    rd = reactive.ReactiveDict({'a': 1})
+    view = rd.map(lambda v: {'double': v * 2})
+    # plain dicts are converted, as when they are stored in the source
+    assert isinstance(view.data['a'], reactive.ReactiveDict)
+    rd['a'] = 2
+    assert view.data['a'].data == {'double': 4}
+    view.stop()
+    subscribers = len(rd.all.on_change.subscribers)
+    with pytest.raises(TypeError):
+        rd.map(lambda v: [v])
+    # the failed view isn't left attached to the source
+    assert len(rd.all.on_change.subscribers) == subscribers
+
+
+def test_view_reactive_value_replaced(env):
+
+    first = reactive.ReactiveDict({'n': 1})
+    second = reactive.ReactiveDict({'n': 2})
+    rd = reactive.ReactiveDict({'x': first})
+    view = rd.filter(lambda v: v.data['n'] > 0)
+    changes = rd.all.sink()
+    changes.start()
+    rd['x'] = second
+    # the replacement is propagated
+    assert view.data['x'] is second
+    assert len(list(changes)) == 1
+    # the inner changes of the new value carry its key
+    second['n'] = -1
+    op, args = list(changes)[-1][0]
+    assert args[1:] == ('x', second)
+    assert 'x' not in view.data
+    # and those of the old one are not followed anymore
+    first['n'] = 5
+    assert len(list(changes)) == 2
+    changes.stop()
+    view.stop()
+
+
+@pytest.mark.parametrize('factory', [
+    lambda rd: rd.map(lambda v: v * 10),
+    lambda rd: rd.sorted(),
+    lambda rd: Sum(rd),
+])
+def test_view_kept_alive(env, factory):
+    """A view keeps following its source when the caller drops its
+    reference, until it's stopped."""
+
+    rd = reactive.ReactiveDict({'a': 1})
+    view = factory(rd)
+    ref = weakref.ref(view)
+    del view
+    gc.collect()
+    view = ref()
+    assert view is not None
+    rd['b'] = 2
+    if isinstance(view, reactive.ReactiveDict):
+        assert dict(view.data) == {'a': 10, 'b': 20}
+    elif isinstance(view, Sum):
+        assert view() == 3
+    else:
+        assert list(view) == ['a', 'b']
+    view.stop()
+    del view
+    gc.collect()
+    assert ref() is None
+
+
+def test_chained_views(env):
+
+    rd = reactive.ReactiveDict({k: k for k in range(10)})
+    evens = rd.map(lambda v: v * 2).filter(lambda v: v % 4 == 0)
+    assert sorted(evens.data) == [0, 2, 4, 6, 8]
+    struct = env.run_comp(lambda c: evens.structure.depend())
+    rd[1] = 2
+    assert evens.data[1] == 4
+    assert struct.invalidated
+    rd[2] = 3
+    assert 2 not in evens.data
+    struct.stop()
+
+
+def test_group_by_view(env):
+
+    rd = reactive.ReactiveDict({'a': 1, 'b': 2, 'c': 3})
+    groups = rd.group_by(lambda v: 'odd' if v % 2 else 'even')
+    assert {g: dict(m.data) for g, m in groups.data.items()} == {
+        'odd': {'a': 1, 'c': 3}, 'even': {'b': 2}}
+    changes = groups.all.sink()
+    changes.start()
+    rd['b'] = 5
+    # the empty group is removed
+    assert {g: dict(m.data) for g, m in groups.data.items()} == {
+        'odd': {'a': 1, 'b': 5, 'c': 3}}
+    rd['a'] = 7
+    # the changes of the members are seen by the dependents of the view
+    assert groups.data['odd'].data['a'] == 7
+    assert len(list(changes)) > 0
+    del rd['c']
+    assert dict(groups.data['odd'].data) == {'a': 7, 'b': 5}
+    changes.stop()
+    groups.stop()
+
+
+def test_sorted_view(env):
+
+    scores = reactive.ReactiveDict({'ann': 10, 'bob': 30, 'cid': 20})
+    board = scores.sorted(reverse=True)
+    assert board.top(2) == [('bob', 30), ('cid', 20)]
+    assert list(board) == ['bob', 'cid', 'ann']
+    podium = env.run_comp(lambda c: board.top(2))
+    tail = env.run_comp(lambda c: board.window(2))
+    middle = env.run_comp(lambda c: board.range(25, 15))
+    # below the podium
+    scores['dan'] = 5
+    assert not podium.invalidated
+    assert tail.invalidated
+    assert not middle.invalidated
+    env.wait_for_flush()
+    # it enters the podium, everything after it shifts
+    scores['ann'] = 40
+    assert podium.invalidated
+    assert tail.invalidated
+    assert not middle.invalidated
+    env.wait_for_flush()
+    assert board.top(2) == [('ann', 40), ('bob', 30)]
+    assert board.window(2) == [('cid', 20), ('dan', 5)]
+    scores['cid'] = 21
+    assert middle.invalidated
+    assert not podium.invalidated
+    env.wait_for_flush()
+    del scores['dan']
+    assert not podium.invalidated
+    assert not middle.invalidated
+    assert board.range(25, 15) == [('cid', 21)]
+    for comp in (podium, tail, middle):
+        comp.stop()
+    board.stop()
+
+
+def test_sorted_view_random(env):
+
+    rnd = random.Random(7)
+    rd = reactive.ReactiveDict()
+    view = rd.sorted(key=lambda v: v[0])
+    view._list.LOAD = 4
+    windows = []
+    comp = env.run_comp(lambda c: windows.append(view.window(3, 8)))
+    for i in range(1000):
+        key = rnd.randrange(200)
+        if key in rd.data and rnd.random() < 0.3:
+            del rd[key]
+        else:
+            rd[key] = (rnd.randrange(50), i)
+        # the window is invalidated whenever its items change
+        assert comp.invalidated or view.window(3, 8) == windows[-1]
+        env.wait_for_flush()
+        expected = sorted(rd.data.items(), key=lambda kv: kv[1][0])
+        assert [v[0] for k, v in view.window(0)] == [
+            v[0] for k, v in expected]
+        in_range = view.range(10, 20)
+        assert [v[0] for k, v in in_range] == sorted(
+            v[0] for v in rd.data.values() if 10 <= v[0] < 20)
+        assert {k for k, v in in_range} == {
+            k for k, v in rd.data.items() if 10 <= v[0] < 20}
+    assert len(view._list._chunks) > 1
+    comp.stop()
+
+
+def test_sorted_list():
+
+    from metapensiero.reactive.views import _SortedList
+
+    rnd = random.Random(3)
+    lst = _SortedList()
+    lst.LOAD = 2
+    expected = []
+    for i in range(2000):
+        if expected and rnd.random() < 0.4:
+            item = rnd.choice(expected)
+            assert lst.remove(item) == expected.index(item)
+            expected.remove(item)
+        else:
+            item = (rnd.randrange(100), i)
+            expected.append(item)
+            expected.sort()
+            assert lst.add(item) == expected.index(item)
+        assert len(lst) == len(expected)
+        start = rnd.randrange(len(expected) + 1)
+        stop = start + rnd.randrange(10)
+        assert lst.slice(start, stop) == expected[start:stop]
+        probe = (rnd.randrange(100), -1)
+        assert lst.bisect(probe) == sum(1 for e in expected if e < probe)
+    assert lst.slice(0, len(lst)) == expected
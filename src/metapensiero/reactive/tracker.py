@@ -6,14 +6,22 @@
 # :Copyright: Copyright (C) 2016 Alberto Berti
 #
 
+import concurrent.futures
 import contextlib
 import logging
+import weakref
 
 from metapensiero import signal
 
-from .computation import AsyncComputation, Computation
+from .computation import (AsyncComputation, Computation,
+                          CoroutineComputation, IncrementalComputation)
 from .dependency import Dependency
 from .exception import ReactiveError
+from .executor import Offloaded
+from .graph import GraphSnapshot
+from .memory import memory_report
+from .profile import Profiler
+from .stats import TrackerStats
 
 from . import undefined
 
@@ -21,6 +29,85 @@ from . import undefined
 logger = logging.getLogger(__name__)
 
 
+class Batch:
+    """A transaction that collects the changes of the dependencies and
+    applies them all at once when it ends. Each changed dependency invalidates
+    its dependents only once and a single flush is requested at the end.
+
+    Use it as a context manager, either with ``with`` or ``async with``.
+    Batches can be nested, only the outermost one commits the changes. As the
+    changed values are already stored when the batch ends, the changes are
+    committed even if an exception is raised inside the block.
+
+    Be aware that when it's used in asynchronous code any change done by
+    other tasks while the block is suspended will be collected as well.
+
+    :param tracker: the :class:`Tracker` instance
+    :param coalesce: if ``True`` the dependencies that emit change events,
+      like :class:`~.dependency.EventDependency`, will emit a single event
+      with all the payloads, see :class:`~.dependency.Coalesced`, instead of
+      one for each of them
+    """
+
+    def __init__(self, tracker, coalesce=False):
+        self.tracker = tracker
+        self.coalesce = coalesce
+        self._changes = {}
+        self._nested = False
+
+    def __enter__(self):
+        if self.tracker._batch is None:
+            self.tracker._batch = self
+        else:
+            self._nested = True
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not self._nested:
+            self.commit()
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        return self.__exit__(exc_type, exc_value, traceback)
+
+    def add(self, dependency, values=None):
+        """Record the change of a dependency.
+
+        :param dependency: the changed :class:`~.dependency.Dependency`
+        :param values: the payload of the change event, if any
+        """
+        payloads = self._changes.get(dependency)
+        if payloads is None:
+            payloads = self._changes[dependency] = []
+        if values is not None:
+            payloads.append(values)
+
+    def commit(self):
+        """Apply the collected changes and request a single flush. An error
+        raised by a dependency doesn't prevent the others from committing
+        their changes, the first one is raised at the end."""
+        tracker = self.tracker
+        if tracker._batch is self:
+            tracker._batch = None
+        changes, self._changes = self._changes, {}
+        error = None
+        with tracker.flusher.hold():
+            for dep, payloads in changes.items():
+                try:
+                    dep._commit(payloads, self.coalesce)
+                except Exception as e:
+                    if error is None:
+                        error = e
+                    else:
+                        logger.exception("Error while committing the "
+                                         "changes of %r", dep)
+        if error is not None:
+            raise error
+
+
 class Tracker(metaclass=signal.SignalAndHandlerInitMeta):
     """The manager of the dependency tracking process."""
 
@@ -30,23 +117,68 @@ class Tracker(metaclass=signal.SignalAndHandlerInitMeta):
     on_after_compute = signal.Signal()
     """Signal emitted at the end of a computation."""
 
-    def __init__(self, flusher_factory=None):
-        self._computations = set()
+    def __init__(self, flusher_factory=None, collect_orphans=False,
+                 stats=False, max_threads=None):
+        self.collect_orphans = collect_orphans
+        """Flag that is ``True`` when this tracker doesn't keep the
+        computations alive. In this mode a computation is garbage collected
+        as soon as no dependency depends on it and nothing else references
+        it."""
+        if collect_orphans:
+            self._computations = weakref.WeakSet()
+        else:
+            self._computations = set()
+        self._registered = 0
+        """Number of the computations ever added"""
+        self._unregistered = 0
+        """Number of the computations removed because stopped"""
+        self._orphaned = []
+        """Computations whose owner has been garbage collected, waiting to be
+        stopped"""
+        self._reclaimed = 0
+        """Number of the orphaned computations stopped"""
+        self._last_reclaimed = 0
         self.non_suspendable = False
         """Flag that is ``True`` when running an operation that should not be
         suspended (by something like asyncio or gevent)."""
         self.current_computation = None
         """Contains the current computation while in_compute is ``True``."""
+        self._inbox = None
+        """The inbox of the changes made by other threads, set by flushers
+        that support them"""
         flusher_factory = flusher_factory or self.FLUSHER_FACTORY
         self.flusher = flusher_factory(self)
         self.in_compute = False
         """Flag that is ``True`` when a Computation is... calculating."""
+        self._batch = None
+        """The active :class:`Batch`, if any."""
+        self.stats = TrackerStats() if stats else None
+        """An instance of :class:`~.stats.TrackerStats` collecting the
+        counters and histograms of the tracking activity or ``None`` when
+        disabled, see :meth:`enable_stats`."""
+        self._profiler = None
+        """The active :class:`~.profile.Profiler`, if any"""
+        self.max_threads = max_threads
+        """The maximum number of the threads used to run the values created
+        by :meth:`threaded`, by default the one chosen by
+        `concurrent.futures.ThreadPoolExecutor`"""
+        self._thread_executor = None
 
     @property
     def active(self):
         """Flag that is ``True`` when a computation is in progress."""
         return self.current_computation is not None
 
+    @property
+    def reclaimed(self):
+        """The number of the computations that have been reclaimed, either
+        because their owner has been garbage collected or, when
+        `collect_orphans` is ``True``, because they were garbage collected
+        themselves."""
+        collected = (self._registered - self._unregistered -
+                     len(self._computations))
+        return self._reclaimed + collected
+
     @property
     def loop(self):
         """This is only needed in Python3, for the signal machinery.
@@ -55,6 +187,16 @@ class Tracker(metaclass=signal.SignalAndHandlerInitMeta):
         """
         return getattr(self.flusher, 'loop', None)
 
+    @property
+    def thread_executor(self):
+        """The thread pool shared by the values created by :meth:`threaded`,
+        with at most :attr:`max_threads` workers. It's created on the first
+        access."""
+        if self._thread_executor is None:
+            self._thread_executor = concurrent.futures.ThreadPoolExecutor(
+                self.max_threads, thread_name_prefix='reactive')
+        return self._thread_executor
+
     @contextlib.contextmanager
     def no_suspend(self):
         """Mark an operation non interruptable by task management systems like
@@ -84,7 +226,8 @@ class Tracker(metaclass=signal.SignalAndHandlerInitMeta):
             self.on_after_compute.notify()
             self.on_after_compute.subscribers.clear()
 
-    def reactive(self, func, on_error=None, with_parent=True):
+    def reactive(self, func, on_error=None, with_parent=True, priority=None,
+                 owner=None, label=None):
         """Wrap the provided function inside an `Computation` instance and
         track its execution.
 
@@ -93,14 +236,82 @@ class Tracker(metaclass=signal.SignalAndHandlerInitMeta):
           error is raised during computation
         :param with_parent: optional flag. If ``False`` do not track parent
           computation
+        :param priority: an optional member of
+          :data:`~.computation.PRIORITY`, the lane used by the flusher to
+          recompute the computation
+        :param owner: an optional object owning the computation, when it's
+          garbage collected the computation will be stopped
+        :param label: an optional name for the computation, used by the
+          diagnostic tools in place of the name of the function
         :returns: an instance of :class:`~.computation.Computation`
         """
         if with_parent:
             cc = self.current_computation
         else:
             cc = None
-        comp = Computation(cc, func, on_error, tracker=self)
-        return comp
+        return Computation(cc, func, on_error, tracker=self, owner=owner,
+                           label=label, priority=priority)
+
+    def incremental(self, func, on_error=None, with_parent=True,
+                    priority=None, owner=None, label=None):
+        """Like :meth:`reactive`, but `func` is called with the changes of
+        the dependencies since its previous run as second argument, so that
+        it can update its result instead of calculating it again:
+
+        .. code:: python
+
+          totals = {}
+
+          def update(comp, changes):
+              if changes is None:
+                  totals.clear()
+                  totals.update((k, sum(v)) for k, v in orders.items())
+              else:
+                  for dep, payloads in changes.items():
+                      for values in payloads:
+                          for op, args in values:
+                              ...
+
+          tracker.incremental(update)
+
+        See :class:`~.computation.IncrementalComputation` for the format of
+        the changes.
+
+        :returns: an instance of
+          :class:`~.computation.IncrementalComputation`
+        """
+        if with_parent:
+            cc = self.current_computation
+        else:
+            cc = None
+        return IncrementalComputation(cc, func, on_error, tracker=self,
+                                      owner=owner, label=label,
+                                      priority=priority)
+
+    def async_autorun(self, func, on_error=None, with_parent=True,
+                      priority=None, owner=None, label=None):
+        """Like :meth:`reactive`, but `func` is a coroutine function, that
+        can ``await`` between the reads of its dependencies. Each run is
+        executed in an asyncio task and it's cancelled if the computation is
+        invalidated before it completes:
+
+        .. code:: python
+
+          async def show_user(comp):
+              user = await cache.lookup(user_id.value)
+              label.text = user.name
+
+          tracker.async_autorun(show_user)
+
+        :returns: an instance of :class:`~.computation.CoroutineComputation`
+        """
+        if with_parent:
+            cc = self.current_computation
+        else:
+            cc = None
+        return CoroutineComputation(cc, func, on_error, tracker=self,
+                                    owner=owner, label=label,
+                                    priority=priority)
 
     def async_reactive(self, func, on_error=None, with_parent=True, equal=None,
                        initial_value=undefined):
@@ -128,6 +339,132 @@ class Tracker(metaclass=signal.SignalAndHandlerInitMeta):
                                 tracker=self)
         return comp
 
+    def offload(self, inputs, func, executor=None, equal=None,
+                initial_value=undefined, on_error=None, label=None):
+        """Create a reactive value calculated by running the pure function
+        `func` in an executor, by default a process pool, with the snapshot
+        returned by `inputs`. The latter runs on the loop and its reads are
+        tracked:
+
+        .. code:: python
+
+          def render(snapshot):
+              scene, size = snapshot
+              return expensive_render(scene, size)
+
+          image = tracker.offload(lambda: (scene.value, size.value), render)
+
+        See :class:`~.executor.Offloaded` for the parameters.
+
+        :returns: an :class:`~.executor.Offloaded` instance
+        """
+        return Offloaded(inputs, func, executor, equal, initial_value,
+                         on_error, tracker=self, label=label)
+
+    def threaded(self, inputs, func, equal=None, initial_value=undefined,
+                 on_error=None, label=None):
+        """Like :meth:`offload`, but `func` runs in the thread pool of this
+        tracker, see :attr:`thread_executor`. This suits functions that
+        release the GIL, like those of NumPy, zlib or hashlib, and saves the
+        pickling of the snapshot and of the result. As the snapshot is not
+        copied, `func` must not modify it.
+
+        :returns: an :class:`~.executor.Offloaded` instance
+        """
+        return Offloaded(inputs, func, self.thread_executor, equal,
+                         initial_value, on_error, tracker=self, label=label)
+
+    def collect(self):
+        """Stop the computations whose owner has been garbage collected. This
+        happens also at the start of every flush.
+
+        :returns: the number of computations reclaimed since the last call
+        """
+        self._stop_orphaned()
+        reclaimed = self.reclaimed
+        result = reclaimed - self._last_reclaimed
+        self._last_reclaimed = reclaimed
+        return result
+
+    def enable_stats(self, **kwargs):
+        """Start collecting the statistics of the tracking activity, like
+        the number of invalidations and recomputations or the duration of the
+        flushes. If they are enabled already, they are reset.
+
+        :param \\*\\*kwargs: passed to :class:`~.stats.TrackerStats`
+        :returns: the :class:`~.stats.TrackerStats` instance
+        """
+        self.stats = TrackerStats(**kwargs)
+        return self.stats
+
+    def disable_stats(self):
+        """Stop collecting the statistics.
+
+        :returns: the last :class:`~.stats.TrackerStats` instance, if any
+        """
+        stats, self.stats = self.stats, None
+        return stats
+
+    def graph_snapshot(self):
+        """Take a snapshot of the live dependency graph, that can be
+        exported as JSON or Graphviz DOT together with its statistics.
+
+        :returns: a :class:`~.graph.GraphSnapshot` instance
+        """
+        return GraphSnapshot(self)
+
+    def memory_report(self, *objects):
+        """Measure the memory retained by the bookkeeping of the live
+        graph, by kind of object. Start `tracemalloc` before creating the
+        graph to also know how much of the traced memory has been allocated
+        by this package.
+
+        :param \\*objects: other objects to account, see
+          :func:`~.memory.memory_report`
+        :returns: a :class:`~.memory.MemoryReport` instance
+        """
+        return memory_report(self, *objects)
+
+    def profile(self):
+        """Profile the computations run by this tracker. It returns a
+        :class:`~.profile.Profiler` instance to be used as a context manager,
+        which collects the profile of the computations run inside the
+        block:
+
+        .. code:: python
+
+          with tracker.profile() as profiler:
+              loop.run_until_complete(main())
+          print(profiler.format_report())
+        """
+        return Profiler(self)
+
+    def _stop_orphaned(self):
+        orphaned, self._orphaned = self._orphaned, []
+        for comp in orphaned:
+            if not comp.stopped:
+                comp.stop()
+                self._reclaimed += 1
+
+    def batch(self, coalesce=False):
+        """Start a transaction that defers the invalidations caused by the
+        changed dependencies until its end, then invalidates each dependent
+        only once and requests a single flush. It returns a :class:`Batch`
+        instance that can be used with both ``with`` and ``async with``:
+
+        .. code:: python
+
+          with tracker.batch():
+              for k, v in updates.items():
+                  rdict[k] = v
+
+        :param coalesce: if ``True`` each
+          :class:`~.dependency.EventDependency` emits a single change event
+          carrying all the payloads of its changes, see
+          :class:`~.dependency.Coalesced`
+        """
+        return Batch(self, coalesce)
+
     def on_invalidate(self, func):
         if self.active:
             self.current_computation.on_invalidate.connect(func)
@@ -142,8 +479,8 @@ class Tracker(metaclass=signal.SignalAndHandlerInitMeta):
     def flush(self):
         self.flusher.require_flush(immediate=True)
 
-    def dependency(self, source=None):
-        return Dependency(source, tracker=self)
+    def dependency(self, source=None, label=None):
+        return Dependency(source, tracker=self, label=label)
 
     @contextlib.contextmanager
     def suspend_computation(self):
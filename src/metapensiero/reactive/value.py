@@ -12,7 +12,7 @@ import operator
 from weakref import WeakKeyDictionary
 
 from . import undefined
-from .base import Tracked
+from .base import Tracked, qualified_name, weak_partial
 from .exception import ReactiveError
 
 logger = logging.getLogger(__name__)
@@ -58,6 +58,13 @@ class Value(Tracked):
             self._value = initial_value
         self._comp = None
         self._always_recompute = always_recompute
+        self._name = (qualified_name(self._generator) if self._generator
+                      else None)
+        """Name used to label the dependencies, see :meth:`__set_name__`"""
+
+    def __set_name__(self, owner, name):
+        self._name = '{}.{}.{}'.format(owner.__module__, owner.__qualname__,
+                                       name)
 
     def _init_descriptor_environment(self):
         """There's no way to distinguish between description and simple
@@ -71,7 +78,7 @@ class Value(Tracked):
         self._descriptor_initialized = True
 
     def _init_single_value_environment(self):
-        self._dep = self.tracker.dependency()
+        self._dep = self.tracker.dependency(self, self._name)
         self._single_value_initialized = True
 
     def _auto(self, instance, generator, comp=None):
@@ -84,8 +91,12 @@ class Value(Tracked):
         if self.tracker.active:
             dep = self._get_member('dep', instance)
             if dep is undefined or dep is None:
-                dep = self.tracker.dependency()
+                dep = self.tracker.dependency(self, self._name)
                 self._set_member('dep', dep, instance)
+            if self._generator:
+                comp = self._get_member('comp', instance)
+                if comp is not undefined and comp is not None:
+                    dep._produced_by(comp)
             dep.depend()
         value = self._get_member('value', instance)
         if self._generator and value is undefined:
@@ -112,16 +123,25 @@ class Value(Tracked):
         self._value = new
         if not self._single_value_initialized:
             self._init_single_value_environment()
+        writer = self.tracker.current_computation
+        if writer is not None:
+            # even when unchanged, so that the readers are ordered after
+            # the writer since the first flush
+            self._dep._produced_by(writer)
         if not ((old is undefined) or self._equal(old, new)):
-            self._dep.changed()
+            self._dep.value_changed(old, new, self._equal)
 
     def _set_instance_value(self, instance, new):
         old = self._value.get(instance, undefined)
         self._value[instance] = new
+        writer = self.tracker.current_computation
+        if writer is not None and instance in self._dep:
+            self._dep[instance]._produced_by(writer)
         if not ((old is undefined) or self._equal(old, new)):
             if instance not in self._dep:
-                self._dep[instance] = self.tracker.dependency()
-            self._dep[instance].changed()
+                self._dep[instance] = self.tracker.dependency(self,
+                                                              self._name)
+            self._dep[instance].value_changed(old, new, self._equal)
 
     def _get_member(self, name, instance=None):
         member = getattr(self, '_' + name)
@@ -141,12 +161,24 @@ class Value(Tracked):
             tracker = self.tracker
             comp = self._get_member('comp', instance)
             if comp is undefined or comp is None:
-                func = functools.partial(self._auto, instance, self._generator)
-                comp = tracker.reactive(func, with_parent=False)
+                if instance:
+                    # the computation must not keep the instance alive
+                    func = weak_partial(self._auto, instance, self._generator)
+                    owner = instance
+                else:
+                    func = functools.partial(self._auto, instance,
+                                             self._generator)
+                    owner = None
+                comp = tracker.reactive(func, with_parent=False, owner=owner,
+                                        label=self._name)
                 if not self._always_recompute:
-                    comp.guard = functools.partial(
-                        self._comp_recompute_guard, instance
-                    )
+                    if instance:
+                        comp.guard = weak_partial(self._comp_recompute_guard,
+                                                  instance)
+                    else:
+                        comp.guard = functools.partial(
+                            self._comp_recompute_guard, instance
+                        )
                 self._set_member('comp', comp, instance)
             if comp.invalidated:
                 comp._recompute()
@@ -0,0 +1,594 @@
+# -*- coding: utf-8 -*-
+# :Project: metapensiero.reactive -- incrementally maintained dict views
+# :Created: ven 16 ott 2026 21:11:10 CEST
+# :Author:  agent <agent@local>
+# :License: GNU General Public License version 3 or later
+#
+
+import bisect
+import itertools
+import logging
+import operator
+
+from .base import Tracked
+from .dependency import Coalesced, Dependency
+from .dict import ReactiveContainerBase, ReactiveDict, missing
+
+logger = logging.getLogger(__name__)
+
+
+def _put(rdict, key, value):
+    """Store a value in a reactive dict, emitting the change events. Like
+    :meth:`~.dict.ReactiveDict.__setitem__` a plain dict is converted to a
+    :class:`~.dict.ReactiveDict`, the other values that are neither hashable
+    nor reactive containers are refused, as their changes can't be
+    followed."""
+    if isinstance(value, dict):
+        value = ReactiveDict(value, tracker=rdict._tracker)
+    elif not (rdict._is_immutable(value) or
+              isinstance(value, ReactiveContainerBase)):
+        raise TypeError("Values of type {} can't be followed, they must be "
+                        "hashable or reactive containers".format(
+                            type(value).__name__))
+    data = rdict.data
+    oldv = data.get(key, missing)
+    data[key] = value
+    rdict._change(key, oldv, value)
+
+
+def _pop(rdict, key):
+    """Remove a key from a reactive dict, if present, emitting the change
+    events."""
+    data = rdict.data
+    if key in data:
+        oldv = data.pop(key)
+        rdict._change(key, oldv, missing)
+
+
+class SourceFollower:
+    """Mixin for the objects maintained incrementally from the change events
+    emitted by the `all` dependency of a :class:`~.dict.ReactiveDict`, the
+    *source*. The subclasses implement :meth:`_source_set` and
+    :meth:`_source_del`.
+
+    The source keeps a reference to each of its followers, so that they
+    keep receiving its changes when nothing else refers to them, until
+    :meth:`stop` is called."""
+
+    _view_source = None
+
+    def _follow_source(self, source):
+        self._view_source = source
+        self._last_change = None
+        """The last change processed, to skip it when it's notified again
+        by another of the dependencies of the source"""
+        self._processed = None
+        """The ids of the changes in the last :class:`~.dependency.Coalesced`
+        payloads processed, which are kept alive by it"""
+        try:
+            for key, value in source.data.items():
+                self._source_set(key, value)
+        except:
+            self._view_source = None
+            raise
+        # connected only now, so that a failed population leaves nothing
+        # attached to the source
+        source.all.on_change.connect(self._on_source_change)
+        if source._followers is None:
+            source._followers = {}
+        source._followers[id(self)] = self
+
+    @property
+    def source(self):
+        return self._view_source
+
+    def _on_coalesced_changes(self, coalesced):
+        """Sync the keys changed by a coalescing batch, each one only once.
+        The changes already processed with the previous payloads, notified
+        by another dependency of the source, are skipped."""
+        if isinstance(self._last_change, Coalesced):
+            processed = self._processed
+        else:
+            processed = ()
+        self._last_change = coalesced
+        self._processed = set()
+        keys = {}
+        for values in coalesced:
+            change = values[0]
+            self._processed.add(id(change))
+            if id(change) in processed:
+                continue
+            op, args = change
+            if args[0] is self._view_source:
+                keys[args[1]] = None
+        for key in keys:
+            self._sync(key)
+
+    def _on_source_change(self, *changes):
+        first = changes[0]
+        if isinstance(first, Coalesced):
+            self._on_coalesced_changes(first)
+            return
+        if first is self._last_change and len(changes) == 1:
+            return
+        self._last_change = first
+        op, args = first
+        if args[0] is self._view_source:
+            self._sync(args[1])
+
+    def _sync(self, key):
+        """Bring a key in line with the source. Its current value is used
+        instead of the one in the change event, because the events of a
+        batch are notified dependency by dependency, not in the order of
+        the changes."""
+        value = self._view_source.data.get(key, missing)
+        if value is missing:
+            self._source_del(key)
+        else:
+            self._source_set(key, value)
+
+    def _source_del(self, key):
+        """Called when a key has been removed from the source, also when
+        it's not known already."""
+        raise NotImplementedError()
+
+    def _source_set(self, key, value):
+        """Called when a key of the source has been added or changed, or when
+        its value, a reactive container, has changed internally. It may be
+        called again with the same value."""
+        raise NotImplementedError()
+
+    def stop(self):
+        """Stop following the changes of the source."""
+        source = self._view_source
+        if source is not None:
+            source.all.on_change.disconnect(self._on_source_change)
+            source._followers.pop(id(self), None)
+            self._view_source = None
+            self._last_change = None
+            self._processed = None
+
+
+class DictView(SourceFollower, ReactiveDict):
+    """The base class of the read-only reactive dictionaries derived from
+    a :class:`~.dict.ReactiveDict`, the *source*.
+
+    A view is populated when it's created and then it's updated by the
+    change events emitted by the `all` dependency of the source, so the work
+    done on each change is proportional to the number of changed keys and
+    not to the size of the source. Being a :class:`~.dict.ReactiveDict`
+    itself, a view can be depended on like any other dict and other views
+    can be derived from it.
+
+    As it relies on the change events, a view doesn't see the replacement
+    of a value that is neither hashable nor a reactive container, because
+    the source doesn't emit an event for it.
+
+    The view is kept alive by the source, call :meth:`stop` when it's not
+    needed anymore.
+
+    :param source: the :class:`~.dict.ReactiveDict` instance
+    """
+
+    def __init__(self, source, *, tracker=None):
+        if tracker is None:
+            tracker = source._tracker
+        ReactiveDict.__init__(self, tracker=tracker)
+        self._follow_source(source)
+
+    def __delitem__(self, key):
+        raise TypeError("{} is read-only".format(type(self).__name__))
+
+    def __setitem__(self, key, value):
+        raise TypeError("{} is read-only".format(type(self).__name__))
+
+    def _source_del(self, key):
+        _pop(self, key)
+
+
+class MappedView(DictView):
+    """A view with the same keys of the source and the values transformed by
+    a function, see :meth:`~.dict.ReactiveDict.map`.
+
+    :param func: a function taking a value of the source and returning the
+      value of the view
+    """
+
+    def __init__(self, source, func, *, tracker=None):
+        self._func = func
+        super().__init__(source, tracker=tracker)
+
+    def _source_set(self, key, value):
+        _put(self, key, self._func(value))
+
+
+class FilteredView(DictView):
+    """A view with the items of the source whose value satisfies a
+    predicate, see :meth:`~.dict.ReactiveDict.filter`.
+
+    :param pred: a function taking a value of the source and returning
+      ``True`` if the item has to be included
+    """
+
+    def __init__(self, source, pred, *, tracker=None):
+        self._pred = pred
+        super().__init__(source, tracker=tracker)
+
+    def _source_set(self, key, value):
+        if self._pred(value):
+            _put(self, key, value)
+        else:
+            _pop(self, key)
+
+
+class GroupedView(DictView):
+    """A view that groups the items of the source by the result of a
+    function, see :meth:`~.dict.ReactiveDict.group_by`. Its values are
+    :class:`~.dict.ReactiveDict` instances with the items of each group,
+    empty groups are removed.
+
+    :param keyfunc: a function taking a value of the source and returning
+      the key of its group
+    """
+
+    def __init__(self, source, keyfunc, *, tracker=None):
+        self._keyfunc = keyfunc
+        self._group_of = {}
+        """The group of each key of the source"""
+        super().__init__(source, tracker=tracker)
+
+    def _remove_member(self, group_key, key):
+        group = self.data[group_key]
+        _pop(group, key)
+        if len(group.data) == 0:
+            _pop(self, group_key)
+
+    def _source_del(self, key):
+        group_key = self._group_of.pop(key, missing)
+        if group_key is not missing:
+            self._remove_member(group_key, key)
+
+    def _source_set(self, key, value):
+        group_key = self._keyfunc(value)
+        old_group_key = self._group_of.get(key, missing)
+        if old_group_key is not missing and old_group_key != group_key:
+            self._remove_member(old_group_key, key)
+        self._group_of[key] = group_key
+        group = self.data.get(group_key)
+        if group is None:
+            group = ReactiveDict(tracker=self._tracker)
+            _put(group, key, value)
+            _put(self, group_key, group)
+        else:
+            _put(group, key, value)
+
+
+class _Descending:
+    """Wrapper that reverses the ordering of a value."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+
+class _SortedList:
+    """A sorted list kept as a list of chunks, each one with no more than
+    twice :attr:`LOAD` items, so that an insertion or a removal moves only
+    the items of a chunk. The lengths of the chunks are summed by a Fenwick
+    tree, so that the positions are found in logarithmic time. The tree is
+    rebuilt only when a chunk is split or removed, once in :attr:`LOAD`
+    operations at most."""
+
+    LOAD = 256
+
+    def __init__(self):
+        self._chunks = []
+        self._maxes = []
+        """The last item of each chunk"""
+        self._len = 0
+        self._tree = None
+        """The Fenwick tree of the lengths of the chunks, ``None`` when it
+        has to be rebuilt"""
+
+    def __len__(self):
+        return self._len
+
+    def _build(self):
+        tree = [len(chunk) for chunk in self._chunks]
+        size = len(tree)
+        for i in range(size):
+            parent = i | (i + 1)
+            if parent < size:
+                tree[parent] += tree[i]
+        self._tree = tree
+        return tree
+
+    def _grow(self, index, delta):
+        """Add `delta` to the length of the given chunk in the tree."""
+        tree = self._tree
+        if tree is not None:
+            size = len(tree)
+            while index < size:
+                tree[index] += delta
+                index |= index + 1
+
+    def _locate(self, pos):
+        """Return the index of the chunk containing the given position and
+        the position in it."""
+        tree = self._tree
+        if tree is None:
+            tree = self._build()
+        index = 0
+        bit = 1 << (len(tree).bit_length() - 1) if tree else 0
+        while bit:
+            nxt = index + bit
+            if nxt <= len(tree) and tree[nxt - 1] <= pos:
+                pos -= tree[nxt - 1]
+                index = nxt
+            bit >>= 1
+        return index, pos
+
+    def _offset(self, index):
+        """Return the position of the first item of the given chunk."""
+        tree = self._tree
+        if tree is None:
+            tree = self._build()
+        result = 0
+        while index > 0:
+            result += tree[index - 1]
+            index &= index - 1
+        return result
+
+    def add(self, item):
+        """Insert an item and return its position."""
+        chunks = self._chunks
+        maxes = self._maxes
+        self._len += 1
+        if not chunks:
+            chunks.append([item])
+            maxes.append(item)
+            self._tree = None
+            return 0
+        index = bisect.bisect_left(maxes, item)
+        if index == len(chunks):
+            index -= 1
+        chunk = chunks[index]
+        pos = bisect.bisect_left(chunk, item)
+        chunk.insert(pos, item)
+        maxes[index] = chunk[-1]
+        self._grow(index, 1)
+        result = self._offset(index) + pos
+        if len(chunk) > 2 * self.LOAD:
+            chunks[index:index + 1] = (chunk[:self.LOAD],
+                                       chunk[self.LOAD:])
+            maxes[index:index + 1] = (chunks[index][-1],
+                                      chunks[index + 1][-1])
+            self._tree = None
+        return result
+
+    def bisect(self, item):
+        """Return the position where the given item would be inserted."""
+        index = bisect.bisect_left(self._maxes, item)
+        if index == len(self._chunks):
+            return self._len
+        return self._offset(index) + bisect.bisect_left(self._chunks[index],
+                                                        item)
+
+    def index(self, item):
+        """Return the position of an item in the list."""
+        index = bisect.bisect_left(self._maxes, item)
+        return self._offset(index) + bisect.bisect_left(self._chunks[index],
+                                                        item)
+
+    def remove(self, item):
+        """Remove an item that is in the list and return its position."""
+        index = bisect.bisect_left(self._maxes, item)
+        chunk = self._chunks[index]
+        pos = bisect.bisect_left(chunk, item)
+        result = self._offset(index) + pos
+        del chunk[pos]
+        self._len -= 1
+        if chunk:
+            self._maxes[index] = chunk[-1]
+            self._grow(index, -1)
+        else:
+            del self._chunks[index]
+            del self._maxes[index]
+            self._tree = None
+        return result
+
+    def slice(self, start, stop):
+        """Return the items from position `start` to `stop` excluded."""
+        stop = min(stop, self._len)
+        if start >= stop:
+            return []
+        chunks = self._chunks
+        index, pos = self._locate(start)
+        result = chunks[index][pos:pos + stop - start]
+        while len(result) < stop - start:
+            index += 1
+            result.extend(chunks[index][:stop - start - len(result)])
+        return result
+
+
+class SortedView(SourceFollower, Tracked):
+    """A view with the items of the source in order of their values or of
+    the result of a function called on them, see
+    :meth:`~.dict.ReactiveDict.sorted`.
+
+    It's maintained incrementally from the change events of the source, see
+    :class:`DictView` for their limits. The items are read by position,
+    with :meth:`window` and :meth:`top`, or by value with :meth:`range`.
+    Each distinct window or range has its own dependency, so a computation
+    reading it is invalidated only when the items it contains, or their
+    values, change and not when other parts of the order do.
+
+    The view is kept alive by the source, call :meth:`stop` when it's not
+    needed anymore.
+
+    :param source: the :class:`~.dict.ReactiveDict` instance
+    :param key: an optional function that is called with each value and
+      returns the key used to sort it
+    :param reverse: if ``True`` the order is descending
+    """
+
+    def __init__(self, source, key=None, reverse=False, *, tracker=None):
+        if tracker is None:
+            tracker = source._tracker
+        super().__init__(tracker=tracker)
+        self._key = key
+        self._reverse = reverse
+        self._list = _SortedList()
+        """The ``(sort key, sequence, key)`` entries in order"""
+        self._entries = {}
+        """The entry of each key of the source"""
+        self._values = {}
+        self._seq = itertools.count()
+        self._windows = {}
+        """The dependencies of the windows read by the computations, by
+        ``(start, stop)``"""
+        self._ranges = {}
+        """The dependencies of the ranges read by the computations, by
+        ``(lo, hi)``"""
+        self._order_dep = Dependency(self, tracker=tracker,
+                                     label='SortedView')
+        """The dependency tracking any change"""
+        self._follow_source(source)
+
+    def __iter__(self):
+        """Iterate over the keys in order."""
+        if self.tracker.active:
+            self._order_dep.depend()
+        return iter([entry[2] for entry in self._list.slice(0, len(self))])
+
+    def __len__(self):
+        return len(self._list)
+
+    def _changed(self, removed, inserted, updated, old_sortkey,
+                 new_sortkey):
+        """Invalidate the dependencies of the windows and ranges affected by
+        a change. The positions are those of the item removed from the
+        list, inserted in it or whose value has been updated in place."""
+        self._order_dep.changed()
+        size = len(self._list) + (1 if inserted is None and
+                                  updated is None else 0)
+        for wkey, dep in list(self._windows.items()):
+            if not dep.has_dependents:
+                del self._windows[wkey]
+                continue
+            start, stop = wkey
+            if stop is None:
+                stop = size
+            if updated is not None:
+                hit = start <= updated < stop
+            elif removed is not None and inserted is not None:
+                hit = (min(removed, inserted) < stop and
+                       max(removed, inserted) >= start)
+            else:
+                pos = inserted if removed is None else removed
+                hit = pos < stop and start < size
+            if hit:
+                dep.changed()
+        for rkey, dep in list(self._ranges.items()):
+            if not dep.has_dependents:
+                del self._ranges[rkey]
+                continue
+            lo, hi = rkey
+            if (self._in_range(old_sortkey, lo, hi) or
+                    self._in_range(new_sortkey, lo, hi)):
+                dep.changed()
+
+    def _in_range(self, sortkey, lo, hi):
+        if sortkey is None:
+            return False
+        return ((lo is None or not sortkey < self._wrap(lo)) and
+                (hi is None or sortkey < self._wrap(hi)))
+
+    def _pairs(self, entries):
+        values = self._values
+        return [(entry[2], values[entry[2]]) for entry in entries]
+
+    def _source_del(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            del self._values[key]
+            removed = self._list.remove(entry)
+            self._changed(removed, None, None, entry[0], None)
+
+    def _source_set(self, key, value):
+        sortkey = self._wrap(value if self._key is None else self._key(value))
+        old = self._entries.get(key)
+        self._values[key] = value
+        if old is not None and old[0] == sortkey:
+            self._changed(None, None, self._list.index(old), sortkey,
+                          sortkey)
+            return
+        removed = None if old is None else self._list.remove(old)
+        entry = self._entries[key] = (sortkey, next(self._seq), key)
+        inserted = self._list.add(entry)
+        self._changed(removed, inserted, None,
+                      None if old is None else old[0], sortkey)
+
+    def _wrap(self, sortkey):
+        return _Descending(sortkey) if self._reverse else sortkey
+
+    def range(self, lo=None, hi=None):
+        """Return the items whose sort key is between `lo`, included, and
+        `hi`, excluded, as a list of ``(key, value)`` tuples in order. When
+        the order is descending `lo` is the greater bound. The current
+        computation is invalidated when an item enters or leaves the range
+        or when the value of one of them changes.
+
+        :param lo: the first sort key, or ``None`` to start from the first
+          item
+        :param hi: the sort key where to stop, or ``None`` to reach the last
+          item
+        """
+        if self.tracker.active:
+            dep = self._ranges.get((lo, hi))
+            if dep is None:
+                dep = self._ranges[(lo, hi)] = Dependency(
+                    self, tracker=self._tracker,
+                    label='SortedView.range({!r}, {!r})'.format(lo, hi))
+            dep.depend()
+        lst = self._list
+        start = 0 if lo is None else lst.bisect((self._wrap(lo),))
+        stop = len(lst) if hi is None else lst.bisect((self._wrap(hi),))
+        return self._pairs(lst.slice(start, stop))
+
+    def top(self, k):
+        """Return the first `k` items, see :meth:`window`."""
+        return self.window(0, k)
+
+    def window(self, start, stop=None):
+        """Return the items from position `start` to `stop` excluded, as a
+        list of ``(key, value)`` tuples in order. The current computation is
+        invalidated only when the items in the window or their values
+        change, including when an insertion or a removal before it shifts
+        them.
+
+        :param start: the first position, non negative
+        :param stop: the position where to stop, or ``None`` to reach the
+          last item
+        """
+        if self.tracker.active:
+            dep = self._windows.get((start, stop))
+            if dep is None:
+                dep = self._windows[(start, stop)] = Dependency(
+                    self, tracker=self._tracker,
+                    label='SortedView[{}:{}]'.format(start, stop))
+            dep.depend()
+        lst = self._list
+        return self._pairs(lst.slice(start, len(lst) if stop is None
+                                     else stop))
+
+
+__all__ = ('DictView', 'FilteredView', 'GroupedView', 'MappedView',
+           'SortedView', 'SourceFollower')